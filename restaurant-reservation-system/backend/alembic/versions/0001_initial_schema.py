@@ -0,0 +1,118 @@
+"""initial schema
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+The schema as the models first defined it, without the lookup indexes added
+since (0006). A database created by create_all before migrations existed
+matches it: `python -m app.db.init_db` stamps such a database with this
+revision, and the later revisions skip whatever it already has.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "locations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+    )
+    op.create_index("ix_locations_id", "locations", ["id"])
+
+    op.create_table(
+        "restaurants",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("location_id", sa.Integer(), sa.ForeignKey("locations.id"), nullable=False),
+        sa.Column("address", sa.String(), nullable=True),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("floor_shape", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_restaurants_id", "restaurants", ["id"])
+
+    op.create_table(
+        "tables",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("restaurant_id", sa.Integer(), sa.ForeignKey("restaurants.id"), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("position_x", sa.Integer(), nullable=False),
+        sa.Column("position_y", sa.Integer(), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=False),
+        sa.Column("height", sa.Integer(), nullable=False),
+        sa.Column("shape", sa.String(), nullable=False),
+        sa.Column("zone", sa.String(), nullable=True),
+        sa.Column("manual_status", sa.String(), nullable=True),
+        sa.Column("manual_status_date", sa.String(), nullable=True),
+    )
+    op.create_index("ix_tables_id", "tables", ["id"])
+
+    op.create_table(
+        "reservations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("table_id", sa.Integer(), sa.ForeignKey("tables.id"), nullable=False),
+        sa.Column("restaurant_id", sa.Integer(), sa.ForeignKey("restaurants.id"), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.Column("user_name", sa.String(), nullable=False),
+        sa.Column("user_phone", sa.String(), nullable=True),
+        sa.Column("user_email", sa.String(), nullable=True),
+        sa.Column("preorder_note", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+    )
+    op.create_index("ix_reservations_id", "reservations", ["id"])
+
+    op.create_table(
+        "table_blocks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("table_id", sa.Integer(), sa.ForeignKey("tables.id"), nullable=False),
+        sa.Column("restaurant_id", sa.Integer(), sa.ForeignKey("restaurants.id"), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.Column("reason", sa.String(), nullable=True),
+    )
+    op.create_index("ix_table_blocks_id", "table_blocks", ["id"])
+
+    op.create_table(
+        "admin_users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("restaurant_id", sa.Integer(), sa.ForeignKey("restaurants.id"), nullable=True),
+    )
+    op.create_index("ix_admin_users_id", "admin_users", ["id"])
+    op.create_index("ix_admin_users_email", "admin_users", ["email"], unique=True)
+
+    op.create_table(
+        "user_messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("subject", sa.String(), nullable=False),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("is_read", sa.Boolean(), nullable=False),
+    )
+    op.create_index("ix_user_messages_id", "user_messages", ["id"])
+
+
+def downgrade():
+    op.drop_table("user_messages")
+    op.drop_table("admin_users")
+    op.drop_table("table_blocks")
+    op.drop_table("reservations")
+    op.drop_table("tables")
+    op.drop_table("restaurants")
+    op.drop_table("locations")
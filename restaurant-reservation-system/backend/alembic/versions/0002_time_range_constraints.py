@@ -0,0 +1,102 @@
+"""time-range columns and overlap constraints
+
+Revision ID: 0002_time_range_constraints
+Revises: 0001_initial_schema
+Create Date: 2026-10-17 09:30:00
+
+PostgreSQL only; other dialects keep the application-level overlap check.
+Adds a generated `during` tsrange column to reservations and table_blocks,
+exclusion constraints so no two active reservations (or two blocks) of a
+table overlap, and triggers that reject a reservation overlapping a block
+and vice versa. All violations raise SQLSTATE 23P01 (exclusion_violation).
+Existing overlapping rows must be resolved before upgrading.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0002_time_range_constraints"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table in ("reservations", "table_blocks"):
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN during tsrange "
+            "GENERATED ALWAYS AS (tsrange(date + start_time, date + end_time)) STORED"
+        )
+
+    # int4range(id, id, '[]') WITH = lets plain GiST compare table ids without btree_gist
+    op.execute(
+        "ALTER TABLE reservations ADD CONSTRAINT reservations_no_overlap "
+        "EXCLUDE USING gist (int4range(table_id, table_id, '[]') WITH =, during WITH &&) "
+        "WHERE (status NOT IN ('cancelled', 'declined'))"
+    )
+    op.execute(
+        "ALTER TABLE table_blocks ADD CONSTRAINT table_blocks_no_overlap "
+        "EXCLUDE USING gist (int4range(table_id, table_id, '[]') WITH =, during WITH &&)"
+    )
+
+    op.execute("""
+        CREATE FUNCTION reservations_block_overlap() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.status NOT IN ('cancelled', 'declined') AND EXISTS (
+                SELECT 1 FROM table_blocks b
+                WHERE b.table_id = NEW.table_id
+                  AND b.date = NEW.date
+                  AND b.during && tsrange(NEW.date + NEW.start_time, NEW.date + NEW.end_time)
+            ) THEN
+                RAISE EXCEPTION 'reservation overlaps a table block'
+                    USING ERRCODE = 'exclusion_violation', CONSTRAINT = 'reservations_block_overlap';
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "CREATE TRIGGER reservations_block_overlap "
+        "BEFORE INSERT OR UPDATE OF table_id, date, start_time, end_time, status ON reservations "
+        "FOR EACH ROW EXECUTE FUNCTION reservations_block_overlap()"
+    )
+
+    op.execute("""
+        CREATE FUNCTION table_blocks_reservation_overlap() RETURNS trigger AS $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM reservations r
+                WHERE r.table_id = NEW.table_id
+                  AND r.date = NEW.date
+                  AND r.status NOT IN ('cancelled', 'declined')
+                  AND r.during && tsrange(NEW.date + NEW.start_time, NEW.date + NEW.end_time)
+            ) THEN
+                RAISE EXCEPTION 'table block overlaps a reservation'
+                    USING ERRCODE = 'exclusion_violation', CONSTRAINT = 'table_blocks_reservation_overlap';
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "CREATE TRIGGER table_blocks_reservation_overlap "
+        "BEFORE INSERT OR UPDATE OF table_id, date, start_time, end_time ON table_blocks "
+        "FOR EACH ROW EXECUTE FUNCTION table_blocks_reservation_overlap()"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("DROP TRIGGER table_blocks_reservation_overlap ON table_blocks")
+    op.execute("DROP FUNCTION table_blocks_reservation_overlap()")
+    op.execute("DROP TRIGGER reservations_block_overlap ON reservations")
+    op.execute("DROP FUNCTION reservations_block_overlap()")
+    op.execute("ALTER TABLE table_blocks DROP CONSTRAINT table_blocks_no_overlap")
+    op.execute("ALTER TABLE reservations DROP CONSTRAINT reservations_no_overlap")
+    op.execute("ALTER TABLE table_blocks DROP COLUMN during")
+    op.execute("ALTER TABLE reservations DROP COLUMN during")
@@ -0,0 +1,43 @@
+"""reservation list indexes
+
+Revision ID: 0003_reservation_list_indexes
+Revises: 0002_time_range_constraints
+Create Date: 2026-10-17 14:00:00
+
+Composite indexes matching the keyset order (date, start_time, id) of
+GET /admin/reservations, unscoped, per restaurant and per restaurant and
+status. The table filter uses the existing (table_id, date) index.
+Databases created by init_db() already have them, hence IF NOT EXISTS.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_reservation_list_indexes"
+down_revision = "0002_time_range_constraints"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_reservations_date_start_time_id", "reservations", ["date", "start_time", "id"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_reservations_restaurant_id_date_start_time_id",
+        "reservations",
+        ["restaurant_id", "date", "start_time", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_reservations_restaurant_id_status_date_start_time_id",
+        "reservations",
+        ["restaurant_id", "status", "date", "start_time", "id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_reservations_restaurant_id_status_date_start_time_id", table_name="reservations")
+    op.drop_index("ix_reservations_restaurant_id_date_start_time_id", table_name="reservations")
+    op.drop_index("ix_reservations_date_start_time_id", table_name="reservations")
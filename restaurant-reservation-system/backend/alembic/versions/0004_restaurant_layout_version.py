@@ -0,0 +1,31 @@
+"""restaurant layout version
+
+Revision ID: 0004_restaurant_layout_version
+Revises: 0003_reservation_list_indexes
+Create Date: 2026-10-17 16:00:00
+
+Adds restaurants.layout_version, the optimistic-concurrency counter for
+floor-plan saves. Databases created by init_db() already have the column.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_restaurant_layout_version"
+down_revision = "0003_reservation_list_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("restaurants")}
+    if "layout_version" not in columns:
+        op.add_column(
+            "restaurants",
+            sa.Column("layout_version", sa.Integer(), nullable=False, server_default="1"),
+        )
+
+
+def downgrade():
+    op.drop_column("restaurants", "layout_version")
@@ -0,0 +1,63 @@
+"""recurring table block rules
+
+Revision ID: 0005_table_block_rules
+Revises: 0004_restaurant_layout_version
+Create Date: 2026-10-17 18:00:00
+
+Daily or weekly block rules with optional end date and per-date exceptions.
+They are evaluated when a date is checked, never expanded into rows; the
+(table_id, weekday, start_date) index narrows one date to its rules.
+Databases created by init_db() already have both tables.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_table_block_rules"
+down_revision = "0004_restaurant_layout_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("table_block_rules"):
+        # Created by init_db()
+        return
+
+    op.create_table(
+        "table_block_rules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("table_id", sa.Integer(), sa.ForeignKey("tables.id"), nullable=False),
+        sa.Column("restaurant_id", sa.Integer(), sa.ForeignKey("restaurants.id"), nullable=False),
+        sa.Column("frequency", sa.String(), nullable=False),
+        sa.Column("weekday", sa.Integer(), nullable=True),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.Column("reason", sa.String(), nullable=True),
+    )
+    op.create_index("ix_table_block_rules_id", "table_block_rules", ["id"])
+    op.create_index("ix_table_block_rules_restaurant_id", "table_block_rules", ["restaurant_id"])
+    op.create_index(
+        "ix_table_block_rules_table_id_weekday_start_date",
+        "table_block_rules",
+        ["table_id", "weekday", "start_date"],
+    )
+
+    op.create_table(
+        "table_block_rule_exceptions",
+        sa.Column(
+            "rule_id",
+            sa.Integer(),
+            sa.ForeignKey("table_block_rules.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("date", sa.Date(), primary_key=True),
+    )
+
+
+def downgrade():
+    op.drop_table("table_block_rule_exceptions")
+    op.drop_table("table_block_rules")
@@ -0,0 +1,33 @@
+"""lookup indexes
+
+Revision ID: 0006_lookup_indexes
+Revises: 0005_table_block_rules
+Create Date: 2026-10-18 10:00:00
+
+Indexes behind the per-date availability and overlap queries: reservations
+and table blocks by (table_id, date), tables by restaurant and restaurants
+by location. Databases created by create_all from the current models, or
+migrated before these moved out of 0001, already have them, hence IF NOT EXISTS.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_lookup_indexes"
+down_revision = "0005_table_block_rules"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_restaurants_location_id", "restaurants", ["location_id"], if_not_exists=True)
+    op.create_index("ix_tables_restaurant_id", "tables", ["restaurant_id"], if_not_exists=True)
+    op.create_index("ix_reservations_table_id_date", "reservations", ["table_id", "date"], if_not_exists=True)
+    op.create_index("ix_table_blocks_table_id_date", "table_blocks", ["table_id", "date"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_table_blocks_table_id_date", table_name="table_blocks")
+    op.drop_index("ix_reservations_table_id_date", table_name="reservations")
+    op.drop_index("ix_tables_restaurant_id", table_name="tables")
+    op.drop_index("ix_restaurants_location_id", table_name="restaurants")
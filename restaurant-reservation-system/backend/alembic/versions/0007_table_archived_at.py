@@ -0,0 +1,27 @@
+"""table archived_at
+
+Revision ID: 0007_table_archived_at
+Revises: 0006_lookup_indexes
+Create Date: 2026-10-18 12:00:00
+
+Adds tables.archived_at. Deleting a table that has reservations now
+archives it, so the reservation history keeps its table; archived tables
+are left out of the floor plan, availability, search and booking.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_table_archived_at"
+down_revision = "0006_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("tables", sa.Column("archived_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("tables", "archived_at")
@@ -1,40 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+import base64
+import datetime
 
-from app.db.session import get_db
+from app.core.profiling import profile_store
+from app.db.pool import pool_status
+from app.db.session import async_engine, engine, get_db, read_after_write, read_async_engine, read_engine
 from app.models.admin_user import AdminUser
 from app.models.reservation import Reservation
 from app.models.table_block import TableBlock
+from app.models.table_block_rule import TableBlockRule, TableBlockRuleException
 from app.models.table import Table
 from app.models.restaurant import Restaurant
 from app.schemas.admin import AdminLogin, AdminToken
-from app.schemas.reservation import ReservationOut, ReservationUpdate
-from app.schemas.table_block import TableBlockCreate, TableBlockOut
-from app.schemas.table import TableCreate, TableUpdate, TableOut
+from app.schemas.reservation import (
+    ReservationOut,
+    ReservationUpdate,
+    ReservationBulkUpdate,
+    ReservationBulkItem,
+    ReservationBulkResult,
+)
+from app.schemas.table_block import (
+    TableBlockCreate,
+    TableBlockOut,
+    TableBlockRuleCreate,
+    TableBlockRuleExceptionCreate,
+    TableBlockRuleOut,
+)
+from app.schemas.table import TableCreate, TableUpdate, TableOut, FloorPlanSave, FloorPlanOut
 from app.schemas.restaurant import RestaurantUpdate, RestaurantOut
-from app.core.security import verify_password, create_access_token, get_current_admin
-from app.services.availability import check_time_overlap
+from app.core.security import (
+    PasswordPoolBusy,
+    password_verifier,
+    create_access_token,
+    get_current_admin,
+    get_restaurant_admin,
+    check_restaurant_access,
+    has_restaurant_access,
+    token_cache,
+)
+from app.services.availability import DAY_END, DAY_START, MAX_CALENDAR_DAYS, check_time_overlap_async
+from app.services.booking import (
+    BookingConflict,
+    has_overlap_constraints,
+    insert_without_overlap_async,
+    is_overlap_violation,
+)
+from app.services.cache import availability_cache
+from app.services.export import EXPORT_COLUMNS, EXPORT_MEDIA_TYPES, stream_export
+from app.services.occupancy_index import occupancy_index
+from app.services.table_lock import TableBusy, table_date_lock
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/admin")
 
 
 @router.post("/login", response_model=AdminToken)
-def admin_login(data: AdminLogin, db: Session = Depends(get_db)):
-    admin = db.query(AdminUser).filter(AdminUser.email == data.email).first()
-    if not admin or not verify_password(data.password, admin.password_hash):
+async def admin_login(data: AdminLogin, db: AsyncSession = Depends(get_db)):
+    row = (await db.execute(
+        select(AdminUser, Restaurant.name)
+        .outerjoin(Restaurant, Restaurant.id == AdminUser.restaurant_id)
+        .where(AdminUser.email == data.email)
+    )).first()
+    if not row:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    admin, restaurant_name = row
+    # bcrypt is CPU-bound; it runs on its own bounded pool
+    try:
+        ok, new_hash = await password_verifier.verify_and_update(data.password, admin.password_hash)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many logins at once, please try again",
+            headers={"Retry-After": "1"},
+        )
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored with an outdated cost: keep the hash made with BCRYPT_ROUNDS
+        admin.password_hash = new_hash
+        await db.commit()
+
     is_super = admin.restaurant_id is None
     token = create_access_token({
         "sub": admin.email,
         "role": admin.role,
         "restaurant_id": admin.restaurant_id,
     })
-    restaurant_name = None
-    if admin.restaurant_id:
-        rest = db.query(Restaurant).filter(Restaurant.id == admin.restaurant_id).first()
-        restaurant_name = rest.name if rest else None
     return AdminToken(
         access_token=token,
         restaurant_id=admin.restaurant_id,
@@ -44,74 +100,159 @@ def admin_login(data: AdminLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/table-blocks", response_model=TableBlockOut, status_code=201)
-def create_table_block(
+async def create_table_block(
     data: TableBlockCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin),
 ):
-    admin_rest_id = admin.get("restaurant_id")
-    if admin_rest_id is not None and admin_rest_id != data.restaurant_id:
-        raise HTTPException(status_code=403, detail="You can only manage your own restaurant")
+    check_restaurant_access(admin, data.restaurant_id)
     if data.start_time >= data.end_time:
         raise HTTPException(status_code=400, detail="Start time must be before end time")
 
-    # Check for conflicts with existing reservations
-    has_conflict = check_time_overlap(
-        db,
+    block = TableBlock(
         table_id=data.table_id,
+        restaurant_id=data.restaurant_id,
         date=data.date,
         start_time=data.start_time,
         end_time=data.end_time,
+        reason=data.reason,
     )
-    if has_conflict:
+    # Writers for the same table and date are serialized; overlaps are rejected
+    # by the database constraint (or checked first on SQLite)
+    try:
+        async with table_date_lock(db, data.table_id, data.date):
+            await insert_without_overlap_async(db, block)
+            await db.commit()
+    except TableBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="This table is busy right now, please try again",
+            headers={"Retry-After": "1"},
+        )
+    except BookingConflict:
         raise HTTPException(
             status_code=409,
             detail="Time conflict with an existing reservation or block",
         )
-
-    block = TableBlock(
-        table_id=data.table_id,
-        restaurant_id=data.restaurant_id,
-        date=data.date,
-        start_time=data.start_time,
-        end_time=data.end_time,
-        reason=data.reason,
-    )
-    db.add(block)
-    db.commit()
-    db.refresh(block)
+    await db.refresh(block)
+    occupancy_index.block_saved(block)
+    availability_cache.invalidate(block.restaurant_id, block.date)
+    read_after_write.record_write(block.restaurant_id)
     return block
 
 
-@router.get("/reservations", response_model=List[ReservationOut])
-def get_reservations(
-    restaurant_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    admin: dict = Depends(get_current_admin),
-):
+RESERVATIONS_PAGE_DEFAULT = 100
+RESERVATIONS_PAGE_MAX = 500
+
+
+def encode_reservation_cursor(reservation: Reservation) -> str:
+    key = f"{reservation.date.isoformat()}|{reservation.start_time.isoformat()}|{reservation.id}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_reservation_cursor(cursor: str):
+    try:
+        date_part, time_part, id_part = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.date.fromisoformat(date_part), datetime.time.fromisoformat(time_part), int(id_part)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def filter_reservations(query, admin: dict, restaurant_id, date_from, date_to, status, table_id):
+    """Applies the admin's restaurant scope and the list filters shared by listing and export."""
     admin_rest_id = admin.get("restaurant_id")
-    query = db.query(Reservation)
     if admin_rest_id is not None:
         # Restaurant admin can only see their own reservations
-        query = query.filter(Reservation.restaurant_id == admin_rest_id)
+        query = query.where(Reservation.restaurant_id == admin_rest_id)
     elif restaurant_id:
-        query = query.filter(Reservation.restaurant_id == restaurant_id)
-    return query.order_by(Reservation.date.desc(), Reservation.start_time.desc()).all()
+        query = query.where(Reservation.restaurant_id == restaurant_id)
+    if date_from:
+        query = query.where(Reservation.date >= date_from)
+    if date_to:
+        query = query.where(Reservation.date <= date_to)
+    if status:
+        query = query.where(Reservation.status == status)
+    if table_id:
+        query = query.where(Reservation.table_id == table_id)
+    return query
+
+
+@router.get("/reservations", response_model=List[ReservationOut])
+async def get_reservations(
+    response: Response,
+    restaurant_id: Optional[int] = Query(None),
+    date_from: Optional[datetime.date] = Query(None),
+    date_to: Optional[datetime.date] = Query(None),
+    status: Optional[str] = Query(None),
+    table_id: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=RESERVATIONS_PAGE_MAX),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    admin: dict = Depends(get_current_admin),
+):
+    """
+    Newest first, ordered by (date, start_time, id). Pass `limit` (or a
+    `cursor`, which pages by RESERVATIONS_PAGE_DEFAULT) to page: the
+    `X-Next-Cursor` response header holds the cursor for the next page and is
+    absent on the last one. With neither every matching row is returned.
+    """
+    query = filter_reservations(
+        select(Reservation), admin, restaurant_id, date_from, date_to, status, table_id
+    )
+    if cursor:
+        # Keyset: continue strictly after the last row of the previous page
+        query = query.where(
+            tuple_(Reservation.date, Reservation.start_time, Reservation.id)
+            < tuple_(*decode_reservation_cursor(cursor))
+        )
+    query = query.order_by(Reservation.date.desc(), Reservation.start_time.desc(), Reservation.id.desc())
+    if limit is None and cursor is None:
+        return (await db.scalars(query)).all()
+    limit = limit or RESERVATIONS_PAGE_DEFAULT
+    rows = (await db.scalars(query.limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_reservation_cursor(rows[-1])
+    return rows
+
+
+@router.get("/reservations/export")
+async def export_reservations(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    restaurant_id: Optional[int] = Query(None),
+    date_from: Optional[datetime.date] = Query(None),
+    date_to: Optional[datetime.date] = Query(None),
+    status: Optional[str] = Query(None),
+    table_id: Optional[int] = Query(None),
+    admin: dict = Depends(get_current_admin),
+):
+    """
+    Streams matching reservations oldest first as CSV or NDJSON. Rows are read
+    through a server-side cursor in chunks, so memory stays flat however many
+    rows the range holds.
+    """
+    query = filter_reservations(
+        select(*EXPORT_COLUMNS), admin, restaurant_id, date_from, date_to, status, table_id
+    ).order_by(Reservation.date, Reservation.start_time, Reservation.id)
+    suffix = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        stream_export(query, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="reservations.{suffix}"'},
+    )
 
 
 @router.patch("/reservations/{reservation_id}", response_model=ReservationOut)
-def update_reservation(
+async def update_reservation(
     reservation_id: int,
     data: ReservationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin),
 ):
-    reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
+    reservation = await db.get(Reservation, reservation_id)
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
-    admin_rest_id = admin.get("restaurant_id")
-    if admin_rest_id is not None and admin_rest_id != reservation.restaurant_id:
-        raise HTTPException(status_code=403, detail="You can only manage your own restaurant")
+    check_restaurant_access(admin, reservation.restaurant_id)
 
     if data.status not in ("confirmed", "cancelled", "declined"):
         raise HTTPException(status_code=400, detail="Invalid status")
@@ -122,35 +263,228 @@ def update_reservation(
     # confirmed reservations remain for that date so the table shows as empty
     if data.status in ("declined", "cancelled"):
         from app.models.table import Table as TableModel
-        remaining = db.query(Reservation).filter(
-            Reservation.table_id == reservation.table_id,
-            Reservation.date == reservation.date,
-            Reservation.status == "confirmed",
-            Reservation.id != reservation.id,
-        ).count()
+        remaining = await db.scalar(
+            select(func.count()).select_from(Reservation).where(
+                Reservation.table_id == reservation.table_id,
+                Reservation.date == reservation.date,
+                Reservation.status == "confirmed",
+                Reservation.id != reservation.id,
+            )
+        )
         if remaining == 0:
-            table_obj = db.query(TableModel).filter(TableModel.id == reservation.table_id).first()
+            table_obj = await db.get(TableModel, reservation.table_id)
             if table_obj and table_obj.manual_status and table_obj.manual_status_date == str(reservation.date):
                 table_obj.manual_status = None
                 table_obj.manual_status_date = None
 
-    db.commit()
-    db.refresh(reservation)
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if is_overlap_violation(exc):
+            raise HTTPException(
+                status_code=409,
+                detail="Time conflict with an existing reservation or block",
+            )
+        raise
+    await db.refresh(reservation)
+    occupancy_index.reservation_saved(reservation)
+    availability_cache.invalidate(reservation.restaurant_id, reservation.date)
+    read_after_write.record_write(reservation.restaurant_id)
     return reservation
 
 
+BULK_STATUS_MAX_IDS = 500
+
+
+@router.post("/reservations/bulk-status", response_model=ReservationBulkResult)
+async def bulk_update_reservations(
+    data: ReservationBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    admin: dict = Depends(get_current_admin),
+):
+    """
+    Sets one status on many reservations in a single transaction. Ids that
+    are missing, belong to another restaurant or would overlap an active
+    booking or block when confirmed again are reported and skipped; the rest
+    are applied.
+    """
+    if data.status not in ("confirmed", "cancelled", "declined"):
+        raise HTTPException(status_code=400, detail="Invalid status")
+    ids = list(dict.fromkeys(data.ids))
+    if len(ids) > BULK_STATUS_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_STATUS_MAX_IDS} reservations per request")
+
+    enforced = await db.run_sync(has_overlap_constraints)
+    found = {r.id: r for r in (await db.scalars(select(Reservation).where(Reservation.id.in_(ids)))).all()}
+    errors = {}
+    plain_ids = []
+    reactivated = []
+    for reservation_id in ids:
+        reservation = found.get(reservation_id)
+        if reservation is None:
+            errors[reservation_id] = "Reservation not found"
+        elif not has_restaurant_access(admin, reservation.restaurant_id):
+            errors[reservation_id] = "You can only manage your own restaurant"
+        elif data.status == "confirmed" and reservation.status in ("cancelled", "declined"):
+            # Back among the active bookings: may conflict, so each is applied on its own
+            reactivated.append(reservation_id)
+        else:
+            plain_ids.append(reservation_id)
+
+    if plain_ids:
+        await db.execute(
+            update(Reservation)
+            .where(Reservation.id.in_(plain_ids))
+            .values(status=data.status)
+            .execution_options(synchronize_session=False)
+        )
+    reactivate = (
+        update(Reservation).values(status=data.status).execution_options(synchronize_session=False)
+    )
+    applied = []
+    for reservation_id in reactivated:
+        reservation = found[reservation_id]
+        if enforced:
+            # The overlap constraint decides; a savepoint keeps the rest of the batch
+            try:
+                async with db.begin_nested():
+                    await db.execute(reactivate.where(Reservation.id == reservation_id))
+            except IntegrityError as exc:
+                if not is_overlap_violation(exc):
+                    raise
+                errors[reservation_id] = "Time conflict with an existing reservation or block"
+            continue
+        # No constraint: check first, against the stored bookings and this batch
+        conflict = await check_time_overlap_async(
+            db, reservation.table_id, reservation.date, reservation.start_time, reservation.end_time,
+            exclude_reservation_id=reservation_id,
+        ) or any(
+            other.table_id == reservation.table_id
+            and other.date == reservation.date
+            and other.start_time < reservation.end_time
+            and other.end_time > reservation.start_time
+            for other in applied
+        )
+        if conflict:
+            errors[reservation_id] = "Time conflict with an existing reservation or block"
+            continue
+        await db.execute(reactivate.where(Reservation.id == reservation_id))
+        applied.append(reservation)
+
+    updated = [found[i] for i in ids if i not in errors]
+    affected = {(r.table_id, r.date) for r in updated}
+
+    # When declining/cancelling, clear manual_status on each affected table and
+    # date once, if no confirmed reservations remain there
+    if data.status in ("declined", "cancelled") and affected:
+        still_confirmed = set(
+            (await db.execute(
+                select(Reservation.table_id, Reservation.date).where(
+                    tuple_(Reservation.table_id, Reservation.date).in_(list(affected)),
+                    Reservation.status == "confirmed",
+                ).distinct()
+            )).all()
+        )
+        cleared = [(table_id, str(date)) for table_id, date in affected if (table_id, date) not in still_confirmed]
+        if cleared:
+            await db.execute(
+                update(Table)
+                .where(
+                    Table.manual_status.is_not(None),
+                    tuple_(Table.id, Table.manual_status_date).in_(cleared),
+                )
+                .values(manual_status=None, manual_status_date=None)
+                .execution_options(synchronize_session=False)
+            )
+
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if is_overlap_violation(exc):
+            raise HTTPException(
+                status_code=409,
+                detail="Time conflict with an existing reservation or block",
+            )
+        raise
+
+    for reservation in updated:
+        occupancy_index.reservation_saved(
+            ReservationOut.model_validate(reservation).model_copy(update={"status": data.status})
+        )
+    for restaurant_id, date in {(r.restaurant_id, r.date) for r in updated}:
+        availability_cache.invalidate(restaurant_id, date)
+        read_after_write.record_write(restaurant_id)
+
+    return ReservationBulkResult(
+        status=data.status,
+        updated=len(updated),
+        results=[
+            ReservationBulkItem(id=i, ok=i not in errors, detail=errors.get(i))
+            for i in ids
+        ],
+    )
+
+
 # ─── Table CRUD ──────────────────────────────────────────────────
 
+async def bump_layout_version(db: AsyncSession, restaurant_id: int):
+    """Every floor-plan change moves the version on, so open editors notice on save."""
+    await db.execute(
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(layout_version=Restaurant.layout_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def future_active_reservations(db: AsyncSession, table_ids: List[int]) -> List[tuple]:
+    """(table_id, count) of pending/confirmed reservations from today on, for tables that have any."""
+    return (await db.execute(
+        select(Reservation.table_id, func.count())
+        .where(
+            Reservation.table_id.in_(table_ids),
+            Reservation.status.in_(["pending", "confirmed"]),
+            Reservation.date >= datetime.date.today(),
+        )
+        .group_by(Reservation.table_id)
+    )).all()
+
+
+async def remove_tables(db: AsyncSession, table_ids: List[int]):
+    """
+    Deletes tables with their blocks and block rules. Tables that have
+    reservations are archived instead, so their history keeps its table.
+    Callers refuse tables with future active reservations first.
+    """
+    with_history = set(
+        (await db.scalars(select(Reservation.table_id).where(Reservation.table_id.in_(table_ids)).distinct())).all()
+    )
+    await db.execute(delete(TableBlock).where(TableBlock.table_id.in_(table_ids)))
+    rule_ids = select(TableBlockRule.id).where(TableBlockRule.table_id.in_(table_ids))
+    await db.execute(delete(TableBlockRuleException).where(TableBlockRuleException.rule_id.in_(rule_ids)))
+    await db.execute(delete(TableBlockRule).where(TableBlockRule.table_id.in_(table_ids)))
+    if with_history:
+        await db.execute(
+            update(Table)
+            .where(Table.id.in_(with_history))
+            .values(archived_at=datetime.datetime.utcnow(), manual_status=None, manual_status_date=None)
+            .execution_options(synchronize_session=False)
+        )
+    unused = [table_id for table_id in table_ids if table_id not in with_history]
+    if unused:
+        await db.execute(delete(Table).where(Table.id.in_(unused)))
+
+
 @router.post("/tables", response_model=TableOut, status_code=201)
-def create_table(
+async def create_table(
     data: TableCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin),
 ):
-    admin_rest_id = admin.get("restaurant_id")
-    if admin_rest_id is not None and admin_rest_id != data.restaurant_id:
-        raise HTTPException(status_code=403, detail="You can only manage your own restaurant")
-    restaurant = db.query(Restaurant).filter(Restaurant.id == data.restaurant_id).first()
+    check_restaurant_access(admin, data.restaurant_id)
+    restaurant = await db.get(Restaurant, data.restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
@@ -166,64 +500,64 @@ def create_table(
         zone=data.zone,
     )
     db.add(table)
-    db.commit()
-    db.refresh(table)
+    await bump_layout_version(db, data.restaurant_id)
+    await db.commit()
+    await db.refresh(table)
+    availability_cache.invalidate(table.restaurant_id)
+    read_after_write.record_write(table.restaurant_id)
     return table
 
 
 @router.patch("/tables/{table_id}", response_model=TableOut)
-def update_table(
+async def update_table(
     table_id: int,
     data: TableUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin),
 ):
-    table = db.query(Table).filter(Table.id == table_id).first()
-    if not table:
+    table = await db.get(Table, table_id)
+    if not table or table.archived_at is not None:
         raise HTTPException(status_code=404, detail="Table not found")
-    admin_rest_id = admin.get("restaurant_id")
-    if admin_rest_id is not None and admin_rest_id != table.restaurant_id:
-        raise HTTPException(status_code=403, detail="You can only manage your own restaurant")
+    check_restaurant_access(admin, table.restaurant_id)
 
     update_data = data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(table, key, value)
 
-    db.commit()
-    db.refresh(table)
+    await bump_layout_version(db, table.restaurant_id)
+    await db.commit()
+    await db.refresh(table)
+    availability_cache.invalidate(table.restaurant_id)
+    read_after_write.record_write(table.restaurant_id)
     return table
 
 
 @router.delete("/tables/{table_id}", status_code=204)
-def delete_table(
+async def delete_table(
     table_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin),
 ):
-    table = db.query(Table).filter(Table.id == table_id).first()
-    if not table:
+    table = await db.get(Table, table_id)
+    if not table or table.archived_at is not None:
         raise HTTPException(status_code=404, detail="Table not found")
-    admin_rest_id = admin.get("restaurant_id")
-    if admin_rest_id is not None and admin_rest_id != table.restaurant_id:
-        raise HTTPException(status_code=403, detail="You can only manage your own restaurant")
+    check_restaurant_access(admin, table.restaurant_id)
 
-    # Prevent deleting tables with active (pending/confirmed) reservations
-    active_count = (
-        db.query(Reservation)
-        .filter(
-            Reservation.table_id == table_id,
-            Reservation.status.in_(["pending", "confirmed"]),
-        )
-        .count()
-    )
-    if active_count > 0:
+    # Prevent deleting tables with upcoming active (pending/confirmed) reservations
+    active = await future_active_reservations(db, [table_id])
+    if active:
         raise HTTPException(
             status_code=409,
-            detail=f"Cannot delete table with {active_count} active reservation(s). Cancel them first.",
+            detail=f"Cannot delete table with {active[0][1]} active reservation(s). Cancel them first.",
         )
 
-    db.delete(table)
-    db.commit()
+    restaurant_id = table.restaurant_id
+    await remove_tables(db, [table_id])
+    await bump_layout_version(db, restaurant_id)
+    await db.commit()
+    occupancy_index.invalidate(table_id)
+    availability_cache.invalidate(restaurant_id)
+    read_after_write.record_write(restaurant_id)
     return None
 
 
@@ -235,22 +569,19 @@ class TableStatusUpdate(BaseModel):
 
 
 @router.patch("/tables/{table_id}/status")
-def set_table_status(
+async def set_table_status(
     table_id: int,
     data: TableStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin),
 ):
-    table = db.query(Table).filter(Table.id == table_id).first()
-    if not table:
+    table = await db.get(Table, table_id)
+    if not table or table.archived_at is not None:
         raise HTTPException(status_code=404, detail="Table not found")
-    admin_rest_id = admin.get("restaurant_id")
-    if admin_rest_id is not None and admin_rest_id != table.restaurant_id:
-        raise HTTPException(status_code=403, detail="You can only manage your own restaurant")
+    check_restaurant_access(admin, table.restaurant_id)
     if data.status not in ("occupied", "empty", "blocked"):
         raise HTTPException(status_code=400, detail="Status must be occupied, empty, or blocked")
 
-    import datetime
     target_date = datetime.date.fromisoformat(data.date)
 
     cancelled_count = 0
@@ -258,39 +589,42 @@ def set_table_status(
 
     if data.status == "empty":
         # Cancel all confirmed reservations for this table on this date
-        reservations = db.query(Reservation).filter(
+        reservations = (await db.scalars(select(Reservation).where(
             Reservation.table_id == table_id,
             Reservation.date == target_date,
             Reservation.status == "confirmed",
-        ).all()
+        ))).all()
         for r in reservations:
             r.status = "cancelled"
             cancelled_count += 1
 
         # Remove all blocks for this table on this date
-        blocks = db.query(TableBlock).filter(
+        blocks = (await db.scalars(select(TableBlock).where(
             TableBlock.table_id == table_id,
             TableBlock.date == target_date,
-        ).all()
+        ))).all()
         for b in blocks:
-            db.delete(b)
+            await db.delete(b)
             removed_blocks += 1
 
     elif data.status == "blocked":
         # Cancel all confirmed reservations for this table on this date
-        reservations = db.query(Reservation).filter(
+        reservations = (await db.scalars(select(Reservation).where(
             Reservation.table_id == table_id,
             Reservation.date == target_date,
             Reservation.status == "confirmed",
-        ).all()
+        ))).all()
         for r in reservations:
             r.status = "cancelled"
             cancelled_count += 1
 
     table.manual_status = data.status
     table.manual_status_date = data.date
-    db.commit()
-    db.refresh(table)
+    await db.commit()
+    await db.refresh(table)
+    occupancy_index.invalidate(table_id, target_date)
+    availability_cache.invalidate(table.restaurant_id, target_date)
+    read_after_write.record_write(table.restaurant_id)
     return {
         "ok": True,
         "table_id": table.id,
@@ -301,25 +635,461 @@ def set_table_status(
     }
 
 
+class BulkTableStatusUpdate(BaseModel):
+    status: str  # "occupied", "empty", "blocked"
+    dates: List[datetime.date]
+    table_ids: Optional[List[int]] = None  # None = every table of the restaurant
+    reason: Optional[str] = None  # stored on the blocks created by "blocked"
+
+
+@router.patch("/restaurants/{restaurant_id}/tables/status")
+async def set_tables_status(
+    restaurant_id: int,
+    data: BulkTableStatusUpdate,
+    db: AsyncSession = Depends(get_db),
+    admin: dict = Depends(get_restaurant_admin),
+):
+    """
+    set_table_status for many tables over one or more dates, as a handful of
+    set-based statements; per table and date it means the same:
+
+    - "empty": cancels confirmed reservations and removes the day's blocks.
+    - "blocked": cancels confirmed reservations; other blocks stay.
+    - "occupied": a same-day marker, so exactly one date.
+
+    The table's manual status is set for the last date, as if the dates were
+    sent one by one. It holds a single date, so for "blocked" the earlier
+    dates get a whole-day block instead, on tables with no block and no
+    pending reservation that day (so nothing is deleted or overlapped).
+    """
+    if data.status not in ("occupied", "empty", "blocked"):
+        raise HTTPException(status_code=400, detail="Status must be occupied, empty, or blocked")
+    dates = sorted(set(data.dates))
+    if not dates:
+        raise HTTPException(status_code=400, detail="At least one date is required")
+    if len(dates) > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CALENDAR_DAYS} dates per request")
+    if data.status == "occupied" and len(dates) > 1:
+        raise HTTPException(status_code=400, detail="Occupied can only be set for a single date")
+    if not await db.get(Restaurant, restaurant_id):
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    table_query = select(Table.id).where(Table.restaurant_id == restaurant_id, Table.archived_at.is_(None))
+    if data.table_ids is not None:
+        table_query = table_query.where(Table.id.in_(data.table_ids))
+    table_ids = list((await db.scalars(table_query)).all())
+    if data.table_ids is not None:
+        missing = sorted(set(data.table_ids) - set(table_ids))
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Tables not found in this restaurant: {missing}")
+
+    cancelled_count = 0
+    removed_blocks = 0
+    created_blocks = 0
+
+    if data.status in ("empty", "blocked"):
+        cancelled = await db.execute(
+            update(Reservation)
+            .where(
+                Reservation.table_id.in_(table_ids),
+                Reservation.date.in_(dates),
+                Reservation.status == "confirmed",
+            )
+            .values(status="cancelled")
+            .execution_options(synchronize_session=False)
+        )
+        cancelled_count = cancelled.rowcount
+
+    if data.status == "empty":
+        removed = await db.execute(
+            delete(TableBlock)
+            .where(TableBlock.table_id.in_(table_ids), TableBlock.date.in_(dates))
+            .execution_options(synchronize_session=False)
+        )
+        removed_blocks = removed.rowcount
+
+    earlier_dates = dates[:-1]
+    if data.status == "blocked" and table_ids and earlier_dates:
+        taken = set((await db.execute(
+            select(TableBlock.table_id, TableBlock.date)
+            .where(TableBlock.table_id.in_(table_ids), TableBlock.date.in_(earlier_dates))
+            .union(
+                select(Reservation.table_id, Reservation.date)
+                .where(
+                    Reservation.table_id.in_(table_ids),
+                    Reservation.date.in_(earlier_dates),
+                    Reservation.status.in_(["pending", "confirmed"]),
+                )
+            )
+        )).all())
+        new_blocks = [
+            {
+                "table_id": table_id,
+                "restaurant_id": restaurant_id,
+                "date": d,
+                "start_time": DAY_START,
+                "end_time": DAY_END,
+                "reason": data.reason,
+            }
+            for table_id in table_ids
+            for d in earlier_dates
+            if (table_id, d) not in taken
+        ]
+        if new_blocks:
+            try:
+                await db.execute(insert(TableBlock), new_blocks)
+            except IntegrityError as exc:
+                # A booking landed between the check and the insert
+                await db.rollback()
+                if is_overlap_violation(exc):
+                    raise HTTPException(
+                        status_code=409,
+                        detail="A reservation was made meanwhile, please try again",
+                    )
+                raise
+        created_blocks = len(new_blocks)
+
+    if table_ids:
+        await db.execute(
+            update(Table)
+            .where(Table.id.in_(table_ids))
+            .values(manual_status=data.status, manual_status_date=str(dates[-1]))
+            .execution_options(synchronize_session=False)
+        )
+
+    await db.commit()
+    for table_id in table_ids:
+        for d in dates:
+            occupancy_index.invalidate(table_id, d)
+    for d in dates:
+        availability_cache.invalidate(restaurant_id, d)
+    read_after_write.record_write(restaurant_id)
+    return {
+        "ok": True,
+        "restaurant_id": restaurant_id,
+        "status": data.status,
+        "dates": dates,
+        "tables": len(table_ids),
+        "cancelled_reservations": cancelled_count,
+        "removed_blocks": removed_blocks,
+        "created_blocks": created_blocks,
+    }
+
+
+# ─── Recurring table blocks ─────────────────────────────────────
+
+async def get_rule_for_admin(db: AsyncSession, rule_id: int, admin: dict) -> TableBlockRule:
+    rule = await db.get(TableBlockRule, rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Block rule not found")
+    check_restaurant_access(admin, rule.restaurant_id)
+    return rule
+
+
+def rule_changed(rule: TableBlockRule):
+    occupancy_index.invalidate(rule.table_id)
+    availability_cache.invalidate(rule.restaurant_id)
+    read_after_write.record_write(rule.restaurant_id)
+
+
+@router.post("/table-block-rules", response_model=TableBlockRuleOut, status_code=201)
+async def create_table_block_rule(
+    data: TableBlockRuleCreate,
+    db: AsyncSession = Depends(get_db),
+    admin: dict = Depends(get_current_admin),
+):
+    check_restaurant_access(admin, data.restaurant_id)
+    if data.frequency not in ("daily", "weekly"):
+        raise HTTPException(status_code=400, detail="Frequency must be daily or weekly")
+    if data.frequency == "weekly" and data.weekday not in range(7):
+        raise HTTPException(status_code=400, detail="Weekly rules need a weekday from 0 (Monday) to 6 (Sunday)")
+    if data.frequency == "daily" and data.weekday is not None:
+        raise HTTPException(status_code=400, detail="Daily rules take no weekday")
+    if data.start_time >= data.end_time:
+        raise HTTPException(status_code=400, detail="Start time must be before end time")
+    if data.end_date is not None and data.end_date < data.start_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    table = await db.get(Table, data.table_id)
+    if not table or table.archived_at is not None or table.restaurant_id != data.restaurant_id:
+        raise HTTPException(status_code=404, detail="Table not found")
+
+    # Like a one-off block, a rule may not cover existing active reservations
+    skipped = set(data.exceptions)
+    query = select(Reservation.date).where(
+        Reservation.table_id == data.table_id,
+        Reservation.date >= data.start_date,
+        Reservation.status.in_(["pending", "confirmed"]),
+        Reservation.start_time < data.end_time,
+        Reservation.end_time > data.start_time,
+    )
+    if data.end_date is not None:
+        query = query.where(Reservation.date <= data.end_date)
+    covered = [
+        d for d in (await db.scalars(query)).all()
+        if d not in skipped and (data.weekday is None or d.weekday() == data.weekday)
+    ]
+    if covered:
+        raise HTTPException(
+            status_code=409,
+            detail=f"The rule covers {len(covered)} active reservation(s), first on {min(covered)}",
+        )
+
+    rule = TableBlockRule(
+        table_id=data.table_id,
+        restaurant_id=data.restaurant_id,
+        frequency=data.frequency,
+        weekday=data.weekday,
+        start_date=data.start_date,
+        end_date=data.end_date,
+        start_time=data.start_time,
+        end_time=data.end_time,
+        reason=data.reason,
+        exceptions=[TableBlockRuleException(date=d) for d in sorted(skipped)],
+    )
+    db.add(rule)
+    await db.commit()
+    await db.refresh(rule)
+    rule_changed(rule)
+    return rule
+
+
+@router.get("/table-block-rules", response_model=List[TableBlockRuleOut])
+async def get_table_block_rules(
+    restaurant_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    admin: dict = Depends(get_current_admin),
+):
+    admin_rest_id = admin.get("restaurant_id")
+    query = select(TableBlockRule)
+    if admin_rest_id is not None:
+        query = query.where(TableBlockRule.restaurant_id == admin_rest_id)
+    elif restaurant_id:
+        query = query.where(TableBlockRule.restaurant_id == restaurant_id)
+    return (await db.scalars(query.order_by(TableBlockRule.table_id, TableBlockRule.id))).all()
+
+
+@router.post("/table-block-rules/{rule_id}/exceptions", response_model=TableBlockRuleOut)
+async def add_table_block_rule_exception(
+    rule_id: int,
+    data: TableBlockRuleExceptionCreate,
+    db: AsyncSession = Depends(get_db),
+    admin: dict = Depends(get_current_admin),
+):
+    rule = await get_rule_for_admin(db, rule_id, admin)
+    if data.date not in {e.date for e in rule.exceptions}:
+        rule.exceptions.append(TableBlockRuleException(date=data.date))
+        await db.commit()
+        await db.refresh(rule)
+    rule_changed(rule)
+    return rule
+
+
+@router.delete("/table-block-rules/{rule_id}", status_code=204)
+async def delete_table_block_rule(
+    rule_id: int,
+    db: AsyncSession = Depends(get_db),
+    admin: dict = Depends(get_current_admin),
+):
+    rule = await get_rule_for_admin(db, rule_id, admin)
+    await db.delete(rule)
+    await db.commit()
+    rule_changed(rule)
+    return None
+
+
+# ─── Occupancy index ────────────────────────────────────────────
+
+@router.get("/occupancy-index")
+async def get_occupancy_index_stats(admin: dict = Depends(get_current_admin)):
+    if admin.get("restaurant_id") is not None:
+        raise HTTPException(status_code=403, detail="Only the super admin can inspect the occupancy index")
+    return occupancy_index.stats()
+
+
+# ─── Availability cache ─────────────────────────────────────────
+
+@router.get("/cache")
+async def get_cache_stats(admin: dict = Depends(get_current_admin)):
+    if admin.get("restaurant_id") is not None:
+        raise HTTPException(status_code=403, detail="Only the super admin can inspect the cache")
+    return availability_cache.stats()
+
+
+@router.delete("/cache")
+async def flush_cache(
+    restaurant_id: Optional[int] = Query(None),
+    admin: dict = Depends(get_current_admin),
+):
+    if admin.get("restaurant_id") is not None:
+        raise HTTPException(status_code=403, detail="Only the super admin can flush the cache")
+    if restaurant_id is not None:
+        availability_cache.invalidate(restaurant_id)
+        return {"ok": True, "restaurant_id": restaurant_id}
+    return {"ok": True, "flushed": availability_cache.clear()}
+
+
+# ─── Token cache ────────────────────────────────────────────────
+
+@router.get("/token-cache")
+async def get_token_cache_stats(admin: dict = Depends(get_current_admin)):
+    if admin.get("restaurant_id") is not None:
+        raise HTTPException(status_code=403, detail="Only the super admin can inspect the token cache")
+    return token_cache.stats()
+
+
+@router.get("/password-pool")
+async def get_password_pool_stats(admin: dict = Depends(get_current_admin)):
+    if admin.get("restaurant_id") is not None:
+        raise HTTPException(status_code=403, detail="Only the super admin can inspect the password pool")
+    return password_verifier.stats()
+
+
+# ─── Database pool ──────────────────────────────────────────────
+
+@router.get("/db-pool")
+async def get_db_pool_stats(admin: dict = Depends(get_current_admin)):
+    if admin.get("restaurant_id") is not None:
+        raise HTTPException(status_code=403, detail="Only the super admin can inspect the database pool")
+    stats = {
+        "async": pool_status(async_engine.sync_engine.pool),
+        "sync": pool_status(engine.pool),
+    }
+    if read_async_engine is not None:
+        stats["read_async"] = pool_status(read_async_engine.sync_engine.pool)
+        stats["read_sync"] = pool_status(read_engine.pool)
+    return stats
+
+
+# ─── Request profiles ───────────────────────────────────────────
+
+@router.get("/profiles")
+async def list_profiles(admin: dict = Depends(get_current_admin)):
+    if admin.get("restaurant_id") is not None:
+        raise HTTPException(status_code=403, detail="Only the super admin can read request profiles")
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, admin: dict = Depends(get_current_admin)):
+    """Collapsed stacks of one profiled request, for flamegraph.pl or speedscope."""
+    if admin.get("restaurant_id") is not None:
+        raise HTTPException(status_code=403, detail="Only the super admin can read request profiles")
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
+
+
 # ─── Restaurant floor shape ─────────────────────────────────────
 
 @router.patch("/restaurants/{restaurant_id}", response_model=RestaurantOut)
-def update_restaurant_floor(
+async def update_restaurant_floor(
     restaurant_id: int,
     data: RestaurantUpdate,
-    db: Session = Depends(get_db),
-    admin: dict = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: dict = Depends(get_restaurant_admin),
 ):
-    admin_rest_id = admin.get("restaurant_id")
-    if admin_rest_id is not None and admin_rest_id != restaurant_id:
-        raise HTTPException(status_code=403, detail="You can only manage your own restaurant")
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = await db.get(Restaurant, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
     if data.floor_shape is not None:
         restaurant.floor_shape = data.floor_shape
+        restaurant.layout_version += 1
 
-    db.commit()
-    db.refresh(restaurant)
+    await db.commit()
+    await db.refresh(restaurant)
+    availability_cache.invalidate(restaurant.id)
+    read_after_write.record_write(restaurant.id)
     return restaurant
+
+
+@router.put("/restaurants/{restaurant_id}/floor-plan", response_model=FloorPlanOut)
+async def save_floor_plan(
+    restaurant_id: int,
+    data: FloorPlanSave,
+    db: AsyncSession = Depends(get_db),
+    admin: dict = Depends(get_restaurant_admin),
+):
+    """
+    Applies a whole editor save (table creates, updates, deletes and the floor
+    shape) in one transaction. `layout_version` must match the stored version,
+    otherwise nothing is written and 409 is returned with the current one.
+    """
+
+    # Compare-and-bump first: it also locks the restaurant row for the rest of the save
+    values = {"layout_version": Restaurant.layout_version + 1}
+    if data.floor_shape is not None:
+        values["floor_shape"] = data.floor_shape
+    bumped = await db.execute(
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id, Restaurant.layout_version == data.layout_version)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if bumped.rowcount == 0:
+        current = await db.scalar(select(Restaurant.layout_version).where(Restaurant.id == restaurant_id))
+        await db.rollback()
+        if current is None:
+            raise HTTPException(status_code=404, detail="Restaurant not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"The floor plan was changed by someone else (now version {current}). Reload and try again.",
+        )
+
+    update_ids = [t.id for t in data.update]
+    delete_ids = list(dict.fromkeys(data.delete))
+    if set(update_ids) & set(delete_ids):
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="A table cannot be both updated and deleted")
+    touched = set(update_ids) | set(delete_ids)
+    if touched:
+        owned = set(
+            (await db.scalars(
+                select(Table.id).where(
+                    Table.id.in_(touched), Table.restaurant_id == restaurant_id, Table.archived_at.is_(None)
+                )
+            )).all()
+        )
+        missing = sorted(touched - owned)
+        if missing:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail=f"Tables not found in this restaurant: {missing}")
+
+    if delete_ids:
+        # Prevent deleting tables with upcoming active (pending/confirmed) reservations
+        active = await future_active_reservations(db, delete_ids)
+        if active:
+            await db.rollback()
+            counts = ", ".join(f"table {table_id}: {count}" for table_id, count in active)
+            raise HTTPException(
+                status_code=409,
+                detail=f"Cannot delete tables with active reservations ({counts}). Cancel them first.",
+            )
+        # Same as deleting one table: reservation history stays
+        await remove_tables(db, delete_ids)
+
+    changes = [t.model_dump(exclude_unset=True) for t in data.update]
+    changes = [c for c in changes if len(c) > 1]
+    if changes:
+        await db.execute(update(Table), changes)
+    if data.create:
+        await db.execute(insert(Table), [{**t.model_dump(), "restaurant_id": restaurant_id} for t in data.create])
+
+    await db.commit()
+
+    for table_id in delete_ids:
+        occupancy_index.invalidate(table_id)
+    availability_cache.invalidate(restaurant_id)
+    read_after_write.record_write(restaurant_id)
+
+    restaurant = await db.get(Restaurant, restaurant_id, populate_existing=True)
+    tables = (await db.scalars(
+        select(Table).where(Table.restaurant_id == restaurant_id, Table.archived_at.is_(None))
+    )).all()
+    return FloorPlanOut(
+        restaurant_id=restaurant_id,
+        layout_version=restaurant.layout_version,
+        floor_shape=restaurant.floor_shape,
+        tables=[TableOut.model_validate(t) for t in tables],
+    )
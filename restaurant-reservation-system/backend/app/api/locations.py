@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.models.location import Location
 from app.schemas.location import LocationOut
 
@@ -10,5 +11,5 @@ router = APIRouter()
 
 
 @router.get("/locations", response_model=List[LocationOut])
-def get_locations(db: Session = Depends(get_db)):
-    return db.query(Location).all()
+async def get_locations(db: AsyncSession = Depends(get_read_db)):
+    return (await db.scalars(select(Location))).all()
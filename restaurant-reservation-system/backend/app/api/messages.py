@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.db.session import get_db
@@ -11,7 +12,7 @@ router = APIRouter(prefix="/messages")
 
 
 @router.post("/", response_model=UserMessageOut)
-def create_message(data: UserMessageCreate, db: Session = Depends(get_db)):
+async def create_message(data: UserMessageCreate, db: AsyncSession = Depends(get_db)):
     """Public endpoint — any user can send a suggestion/message."""
     msg = UserMessage(
         name=data.name,
@@ -20,46 +21,46 @@ def create_message(data: UserMessageCreate, db: Session = Depends(get_db)):
         message=data.message,
     )
     db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    await db.commit()
+    await db.refresh(msg)
     return msg
 
 
 @router.get("/", response_model=List[UserMessageOut])
-def get_messages(
-    db: Session = Depends(get_db),
+async def get_messages(
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin),
 ):
     """Admin-only — list all messages, newest first."""
-    return db.query(UserMessage).order_by(UserMessage.created_at.desc()).all()
+    return (await db.scalars(select(UserMessage).order_by(UserMessage.created_at.desc()))).all()
 
 
 @router.patch("/{message_id}/read", response_model=UserMessageOut)
-def mark_read(
+async def mark_read(
     message_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin),
 ):
     """Admin-only — mark a message as read."""
-    msg = db.query(UserMessage).filter(UserMessage.id == message_id).first()
+    msg = await db.get(UserMessage, message_id)
     if not msg:
         raise HTTPException(status_code=404, detail="Message not found")
     msg.is_read = True
-    db.commit()
-    db.refresh(msg)
+    await db.commit()
+    await db.refresh(msg)
     return msg
 
 
 @router.delete("/{message_id}")
-def delete_message(
+async def delete_message(
     message_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin),
 ):
     """Admin-only — delete a message."""
-    msg = db.query(UserMessage).filter(UserMessage.id == message_id).first()
+    msg = await db.get(UserMessage, message_id)
     if not msg:
         raise HTTPException(status_code=404, detail="Message not found")
-    db.delete(msg)
-    db.commit()
+    await db.delete(msg)
+    await db.commit()
     return {"ok": True}
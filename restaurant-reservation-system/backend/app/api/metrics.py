@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import CONTENT_TYPE, exporter
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    # Sync on purpose: merging the worker files is blocking I/O, so it runs on the threadpool
+    return Response(exporter.render(), media_type=CONTENT_TYPE)
@@ -1,52 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.db.session import get_db
+from app.db.session import get_db, read_after_write
 from app.models.reservation import Reservation
 from app.models.table import Table
-from app.schemas.reservation import ReservationCreate, ReservationOut
-from app.services.availability import check_time_overlap
+from app.schemas.reservation import ReservationCreate, ReservationOut, ReservationConflict
+from app.services.availability import suggest_alternative_slots_async
+from app.services.booking import BookingConflict, insert_without_overlap_async
+from app.services.cache import availability_cache
+from app.services.occupancy_index import occupancy_index
+from app.services.table_lock import TableBusy, table_date_lock
 
 router = APIRouter()
 
 
-@router.post("/reservations", response_model=ReservationOut, status_code=201)
-def create_reservation(data: ReservationCreate, db: Session = Depends(get_db)):
+async def conflict_response(db: AsyncSession, table_obj: Table, data: ReservationCreate, detail: str) -> JSONResponse:
+    """409 body carrying the nearest free windows of the same length."""
+    suggestions = await suggest_alternative_slots_async(
+        db, table_obj, data.date, data.start_time, data.end_time
+    )
+    return JSONResponse(
+        status_code=409,
+        content=jsonable_encoder(ReservationConflict(detail=detail, suggestions=suggestions)),
+    )
+
+
+@router.post(
+    "/reservations",
+    response_model=ReservationOut,
+    status_code=201,
+    responses={409: {"model": ReservationConflict}},
+)
+async def create_reservation(data: ReservationCreate, response: Response, db: AsyncSession = Depends(get_db)):
     # Validate times
     if data.start_time >= data.end_time:
         raise HTTPException(status_code=400, detail="Start time must be before end time")
 
     # Check if admin has manually set this table as occupied or blocked for this date
-    table_obj = db.query(Table).filter(Table.id == data.table_id).first()
-    if not table_obj:
+    table_obj = await db.get(Table, data.table_id)
+    if not table_obj or table_obj.archived_at is not None:
         raise HTTPException(status_code=404, detail="Table not found")
     if (
         table_obj.manual_status
         and table_obj.manual_status_date == str(data.date)
         and table_obj.manual_status in ("occupied", "blocked")
     ):
-        raise HTTPException(
-            status_code=409,
-            detail="This table is currently unavailable (set by admin as "
+        return await conflict_response(
+            db,
+            table_obj,
+            data,
+            "This table is currently unavailable (set by admin as "
             + table_obj.manual_status
             + ")",
         )
 
-    # Check for time conflicts
-    has_conflict = check_time_overlap(
-        db,
-        table_id=data.table_id,
-        date=data.date,
-        start_time=data.start_time,
-        end_time=data.end_time,
-    )
-    if has_conflict:
-        raise HTTPException(
-            status_code=409,
-            detail="This table is already reserved or blocked for the selected time range",
-        )
-
     reservation = Reservation(
         table_id=data.table_id,
         restaurant_id=data.restaurant_id,
@@ -59,7 +69,31 @@ def create_reservation(data: ReservationCreate, db: Session = Depends(get_db)):
         preorder_note=data.preorder_note,
         status="pending",
     )
-    db.add(reservation)
-    db.commit()
-    db.refresh(reservation)
-    return reservation
+    # Writers for the same table and date are serialized; overlaps are rejected
+    # by the database constraint (or checked first on SQLite)
+    try:
+        async with table_date_lock(db, data.table_id, data.date):
+            await insert_without_overlap_async(db, reservation)
+            # Serialize before commit so nothing is re-read from the expired instance
+            result = ReservationOut.model_validate(reservation)
+            restaurant_id = table_obj.restaurant_id
+            await db.commit()
+    except TableBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="This table is busy right now, please try again",
+            headers={"Retry-After": "1"},
+        )
+    except BookingConflict:
+        return await conflict_response(
+            db,
+            table_obj,
+            data,
+            "This table is already reserved or blocked for the selected time range",
+        )
+
+    occupancy_index.reservation_saved(result)
+    availability_cache.invalidate(restaurant_id, result.date)
+    # Keep this guest (and reads about this restaurant) on the primary until replicas catch up
+    read_after_write.mark_response(response, restaurant_id)
+    return result
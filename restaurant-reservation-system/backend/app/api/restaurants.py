@@ -1,56 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import datetime
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.models.restaurant import Restaurant
 from app.models.table import Table
 from app.schemas.restaurant import RestaurantOut
-from app.schemas.table import TableOut, TableAvailability
-from app.services.availability import get_table_status
+from app.schemas.table import TableOut, TableAvailability, DayAvailability
+from app.services.availability import (
+    get_table_statuses_async,
+    get_availability_calendar_async,
+    MAX_CALENDAR_DAYS,
+)
+from app.services.cache import availability_cache
 
 router = APIRouter()
 
 
 @router.get("/restaurants", response_model=List[RestaurantOut])
-def get_restaurants(location_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
-    query = db.query(Restaurant)
+async def get_restaurants(location_id: Optional[int] = Query(None), db: AsyncSession = Depends(get_read_db)):
+    query = select(Restaurant)
     if location_id:
-        query = query.filter(Restaurant.location_id == location_id)
-    return query.all()
+        query = query.where(Restaurant.location_id == location_id)
+    return (await db.scalars(query)).all()
 
 
 @router.get("/restaurants/{restaurant_id}", response_model=RestaurantOut)
-def get_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+async def get_restaurant(restaurant_id: int, db: AsyncSession = Depends(get_read_db)):
+    restaurant = await db.get(Restaurant, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     return restaurant
 
 
 @router.get("/restaurants/{restaurant_id}/tables", response_model=List[TableOut])
-def get_tables(restaurant_id: int, db: Session = Depends(get_db)):
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+async def get_tables(restaurant_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    # Before the first query: on SQLite the read snapshot starts there
+    generation = availability_cache.generation()
+    restaurant = await db.get(Restaurant, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
-    return db.query(Table).filter(Table.restaurant_id == restaurant_id).all()
+
+    cache_key = ("tables", restaurant_id, None)
+    # A guest who just wrote reads past the cache, which only this worker's writes invalidate
+    cached = None if request.state.needs_primary else availability_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    tables = (await db.scalars(select(Table).where(Table.restaurant_id == restaurant_id, Table.archived_at.is_(None)))).all()
+    result = [TableOut.model_validate(t) for t in tables]
+    availability_cache.set(cache_key, result, generation)
+    return result
 
 
 @router.get("/restaurants/{restaurant_id}/availability", response_model=List[TableAvailability])
-def get_availability(
+async def get_availability(
     restaurant_id: int,
+    request: Request,
     date: datetime.date = Query(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    generation = availability_cache.generation()
+    restaurant = await db.get(Restaurant, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    tables = db.query(Table).filter(Table.restaurant_id == restaurant_id).all()
+    cache_key = ("availability", restaurant_id, date)
+    cached = None if request.state.needs_primary else availability_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    tables = (await db.scalars(select(Table).where(Table.restaurant_id == restaurant_id, Table.archived_at.is_(None)))).all()
+    statuses = await get_table_statuses_async(db, tables, date)
     result = []
     for table in tables:
-        status = get_table_status(db, table.id, date)
+        status = statuses[table.id]
         result.append(
             TableAvailability(
                 id=table.id,
@@ -66,4 +90,28 @@ def get_availability(
                 status=status,
             )
         )
+    availability_cache.set(cache_key, result, generation)
     return result
+
+
+@router.get("/restaurants/{restaurant_id}/availability/calendar", response_model=List[DayAvailability])
+async def get_availability_range(
+    restaurant_id: int,
+    start_date: datetime.date = Query(...),
+    end_date: datetime.date = Query(...),
+    include_tables: bool = Query(False),
+    db: AsyncSession = Depends(get_read_db),
+):
+    restaurant = await db.get(Restaurant, restaurant_id)
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if (end_date - start_date).days + 1 > MAX_CALENDAR_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range cannot exceed {MAX_CALENDAR_DAYS} days",
+        )
+
+    tables = (await db.scalars(select(Table).where(Table.restaurant_id == restaurant_id, Table.archived_at.is_(None)))).all()
+    return await get_availability_calendar_async(db, tables, start_date, end_date, include_tables)
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import datetime
+
+from app.db.session import get_db
+from app.schemas.table import TableSearchResult
+from app.services.search import search_free_tables_async
+
+router = APIRouter(prefix="/search")
+
+
+@router.get("/tables", response_model=List[TableSearchResult])
+async def search_tables(
+    location_id: int = Query(...),
+    date: datetime.date = Query(...),
+    start_time: datetime.time = Query(...),
+    end_time: datetime.time = Query(...),
+    party_size: int = Query(..., ge=1),
+    zone: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+):
+    """Public endpoint — free tables across every restaurant in a location."""
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="Start time must be before end time")
+
+    rows = await search_free_tables_async(
+        db,
+        location_id=location_id,
+        date=date,
+        start_time=start_time,
+        end_time=end_time,
+        party_size=party_size,
+        zone=zone,
+        limit=limit,
+    )
+    return [
+        TableSearchResult(
+            id=table.id,
+            restaurant_id=table.restaurant_id,
+            restaurant_name=restaurant_name,
+            name=table.name,
+            capacity=table.capacity,
+            zone=table.zone,
+        )
+        for table, restaurant_name in rows
+    ]
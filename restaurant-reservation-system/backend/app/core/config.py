@@ -1,4 +1,6 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
+import datetime
 
 
 class Settings(BaseSettings):
@@ -6,6 +8,42 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "super-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_ENTRIES: int = 1024
+    BCRYPT_ROUNDS: int = 12  # stored hashes with another cost are re-hashed on login
+    PASSWORD_HASH_WORKERS: int = 2  # threads dedicated to bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 64  # logins running or queued before 503
+    # Comma-separated browser origins allowed to call the API; "*" allows any (the origin is
+    # echoed back, as credentialed CORS requires)
+    CORS_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
+    DB_ASYNC: bool = True
+    READ_DATABASE_URL: Optional[str] = None  # streaming replica for the public read endpoints
+    READ_AFTER_WRITE_SECONDS: float = 5.0  # upper bound on replica lag; reads stay on the primary this long
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 keeps connections forever
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_NULLPOOL: bool = False  # set when running behind pgbouncer
+    OCCUPANCY_INDEX_ENABLED: bool = False
+    OCCUPANCY_INDEX_MAX_ENTRIES: int = 20000
+    AVAILABILITY_CACHE_ENABLED: bool = True
+    AVAILABILITY_CACHE_MAX_ENTRIES: int = 5000
+    AVAILABILITY_CACHE_TTL_SECONDS: float = 30.0
+    SUGGESTION_HOURS_START: datetime.time = datetime.time(10, 0)  # alternative slots offered on a 409
+    SUGGESTION_HOURS_END: datetime.time = datetime.time(23, 0)  # start and end inside these hours
+    TABLE_LOCK_ATTEMPTS: int = 8
+    TABLE_LOCK_BACKOFF_SECONDS: float = 0.01
+    QUERY_STATS_ENABLED: bool = False  # dev: per-request query count/time headers and N+1 warnings
+    QUERY_STATS_N_PLUS_ONE_THRESHOLD: int = 5  # same statement this many times in one request
+    METRICS_ENABLED: bool = True  # Prometheus text format at /metrics
+    METRICS_DIR: Optional[str] = None  # shared by all uvicorn workers; unset = this process only
+    METRICS_FLUSH_SECONDS: float = 5.0
+    SERVER_TIMING_ENABLED: bool = False  # Server-Timing header: auth, db, serialization, json, total
+    PROFILING_ENABLED: bool = False  # when on, super admin requests with "X-Profile: 1" are profiled
+    PROFILE_DIR: str = "/tmp/resres-profiles"  # shared by all uvicorn workers
+    PROFILE_SAMPLE_INTERVAL_MS: float = 1.0
+    PROFILE_MAX_STORED: int = 50
 
     class Config:
         env_file = ".env"
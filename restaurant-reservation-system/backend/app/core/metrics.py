@@ -0,0 +1,380 @@
+"""
+Prometheus metrics without a client library.
+
+Recording is lock-free: every thread increments its own shard (a plain
+dict reached through threading.local), so the event loop, the threadpool
+and the DB session threads never contend. Shards are only summed when
+/metrics is scraped.
+
+With several uvicorn workers each process also writes its totals to
+METRICS_DIR/metrics-<pid>.json every METRICS_FLUSH_SECONDS (and on scrape);
+whichever worker serves /metrics adds up all files, so the result covers
+every worker no matter which one Prometheus reaches. A worker deletes its
+file when it shuts down, and a starting worker deletes the files of
+processes that are no longer running, so totals only cover live workers;
+Prometheus treats the drop as a counter reset.
+"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+import glob
+import json
+import os
+import threading
+import time
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Sharded(ABC):
+    """
+    Per-thread value dicts, summed on collect. Shards of threads that have
+    exited (idle threadpool workers do) are folded into one retired total
+    when collecting.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+        self._lock = threading.Lock()  # registration and collection only, never on record
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    @abstractmethod
+    def _merge(self, totals: dict, labels: tuple, value):
+        """Adds one shard's `value` for `labels` into `totals`."""
+
+    def collect(self) -> dict:
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    for labels, value in shard.items():
+                        self._merge(self._retired, labels, value)
+            self._shards = live
+            totals: dict = {}
+            for labels, value in self._retired.items():
+                self._merge(totals, labels, value)
+            for _, shard in live:
+                # dict.items() copied in one C call, safe while the owner keeps writing
+                for labels, value in list(shard.items()):
+                    self._merge(totals, labels, value)
+        return totals
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def inc(self, *labels, amount: float = 1.0):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def _merge(self, totals: dict, labels: tuple, value):
+        totals[labels] = totals.get(labels, 0.0) + value
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        shard = self._shard()
+        row = shard.get(labels)
+        if row is None:
+            # per-bucket counts (not cumulative), +Inf, then sum
+            row = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def _merge(self, totals: dict, labels: tuple, row):
+        total = totals.get(labels)
+        if total is None:
+            totals[labels] = list(row)
+        else:
+            for i, value in enumerate(row):
+                total[i] += value
+
+
+class CallbackMetric:
+    """Values read from existing stats at scrape time; summed across workers."""
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], Dict[tuple, float]],
+                 labelnames=(), kind: str = "counter"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.kind = kind
+        self._read = read
+
+    def collect(self) -> Dict[tuple, float]:
+        try:
+            return self._read()
+        except Exception:
+            return {}
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> dict:
+        """This process's values in a JSON-friendly shape."""
+        return {
+            metric.name: [[list(labels), value] for labels, value in metric.collect().items()]
+            for metric in self.metrics
+        }
+
+    def render(self, snapshots: List[dict]) -> str:
+        """Prometheus text format for the sum of `snapshots`."""
+        lines = []
+        for metric in self.metrics:
+            merged: Dict[tuple, object] = {}
+            for snapshot in snapshots:
+                for labels, value in snapshot.get(metric.name, []):
+                    key = tuple(labels)
+                    if metric.kind == "histogram":
+                        total = merged.setdefault(key, [0] * len(value))
+                        for i, v in enumerate(value):
+                            total[i] += v
+                    else:
+                        merged[key] = merged.get(key, 0.0) + value
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key in sorted(merged):
+                value = merged[key]
+                pairs = [f'{n}="{_escape(v)}"' for n, v in zip(metric.labelnames, key)]
+                if metric.kind != "histogram":
+                    lines.append(f"{metric.name}{_labels(pairs)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), value[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    bucket_pairs = pairs + [f'le="{le}"']
+                    lines.append(f"{metric.name}_bucket{_labels(bucket_pairs)} {cumulative}")
+                lines.append(f"{metric.name}_sum{_labels(pairs)} {_number(value[-1])}")
+                lines.append(f"{metric.name}_count{_labels(pairs)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: List[str]) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "resres_http_requests_total", "HTTP requests by route template and status code.",
+    ("method", "route", "status"),
+))
+HTTP_LATENCY = registry.register(Histogram(
+    "resres_http_request_duration_seconds", "Time from request start to the last body byte.",
+    ("method", "route"),
+))
+DB_QUERY_LATENCY = registry.register(Histogram(
+    "resres_db_query_duration_seconds", "Time spent in each SQL statement (cursor execute).",
+))
+DB_POOL_WAIT = registry.register(Histogram(
+    "resres_db_pool_checkout_wait_seconds", "Time waited for a pooled connection.",
+))
+DB_POOL_TIMEOUTS = registry.register(Counter(
+    "resres_db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT.",
+))
+BOOKING_ATTEMPTS = registry.register(Counter(
+    "resres_booking_attempts_total", "Calls to the booking and table-block endpoints.", ("endpoint",),
+))
+BOOKING_CONFLICTS = registry.register(Counter(
+    "resres_booking_conflicts_total", "Of those, the ones answered 409 because the slot was taken.", ("endpoint",),
+))
+
+# Endpoints whose 409s are slot conflicts; their rate is conflicts / attempts
+CONFLICT_ENDPOINTS = {"create_reservation", "create_table_block"}
+
+
+def _availability_cache_counts():
+    from app.services.cache import availability_cache
+
+    stats = availability_cache.stats()
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+
+def _token_cache_counts():
+    from app.core.security import token_cache
+
+    stats = token_cache.stats()
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+
+registry.register(CallbackMetric(
+    "resres_availability_cache_lookups_total", "Availability cache lookups by result.",
+    _availability_cache_counts, ("result",),
+))
+registry.register(CallbackMetric(
+    "resres_token_cache_lookups_total", "Verified admin token cache lookups by result.",
+    _token_cache_counts, ("result",),
+))
+
+
+class MultiprocessExporter:
+    """Writes this worker's snapshot to the shared directory and merges everyone's."""
+
+    def __init__(self, directory: Optional[str], flush_seconds: float = 5.0):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pid: Optional[int] = None
+
+    def _path(self) -> str:
+        return os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+
+    def _remove_stale(self):
+        """Deletes the files of processes that are no longer running (earlier runs, killed workers)."""
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json*")):
+            pid = os.path.basename(path)[len("metrics-"):].split(".")[0]
+            if pid.isdigit() and not _running(int(pid)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def flush(self):
+        if not self.directory:
+            return
+        path = self._path()
+        with open(path + ".tmp", "w") as f:
+            json.dump(registry.snapshot(), f)
+        os.replace(path + ".tmp", path)
+
+    def start(self):
+        """Starts the periodic flush for the current process (call after the worker forked)."""
+        if not self.directory or self._pid == os.getpid():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._remove_stale()
+        self._pid = os.getpid()
+        self._stop.clear()
+        # Replaces a leftover file of an earlier process that had the same pid
+        self.flush()
+
+        def loop():
+            while not self._stop.wait(self.flush_seconds):
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+        self._thread = threading.Thread(target=loop, name="metrics-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the periodic flush and deletes this worker's file, so it no longer counts."""
+        if self._pid != os.getpid():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._pid = None
+        for path in (self._path(), self._path() + ".tmp"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def render(self) -> str:
+        if not self.directory:
+            return registry.render([registry.snapshot()])
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return registry.render(snapshots)
+
+
+def _running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+exporter = MultiprocessExporter(settings.METRICS_DIR, settings.METRICS_FLUSH_SECONDS)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording count, status and latency per route template
+    (so /restaurants/{restaurant_id} stays one series), plus booking conflicts.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        began = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method, template, status[0])
+            HTTP_LATENCY.observe(time.perf_counter() - began, method, template)
+            endpoint = getattr(scope.get("endpoint"), "__name__", None)
+            if endpoint in CONFLICT_ENDPOINTS:
+                BOOKING_ATTEMPTS.inc(endpoint)
+                if status[0] == 409:
+                    BOOKING_CONFLICTS.inc(endpoint)
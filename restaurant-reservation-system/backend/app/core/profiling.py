@@ -0,0 +1,295 @@
+"""
+Request timing breakdown and on-demand profiling.
+
+ServerTimingMiddleware adds a Server-Timing header splitting a request into
+auth (the admin token dependency, see timed_dependency), db (SQL statements, from app.db.query_stats),
+serialization (response_model validation) and json (encoding), plus the
+total up to the first response byte. Browsers show it in the network panel.
+
+ProfilerMiddleware profiles a single request when a super admin sends it
+with `X-Profile: 1`: a sampling thread records the Python stacks of the
+worker every PROFILE_SAMPLE_INTERVAL_MS, the event loop thread always and
+other threads (threadpool, DB_ASYNC=false sessions) while they are not idle.
+The result is stored in PROFILE_DIR in the collapsed-stack format read by
+flamegraph.pl and speedscope, one root frame per thread, and its id is
+returned in X-Profile-Id for download from /admin/profiles/{id}. The worker
+is shared, so samples can include other requests served at the same time;
+profile on a quiet worker.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional
+import asyncio
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+# ─── Server-Timing ──────────────────────────────────────────────
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timings", default=None)
+
+
+@contextmanager
+def phase(name: str):
+    """Adds the block's duration to `name` in the current request's Server-Timing."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - began
+
+
+class TimedJSONResponse(JSONResponse):
+    """The app's default response class; JSON encoding counts as the `json` phase."""
+
+    def render(self, content) -> bytes:
+        with phase("json"):
+            return super().render(content)
+
+
+def install_serialization_timing():
+    """
+    Times FastAPI's response_model validation/serialization as `serialization`.
+    FastAPI looks serialize_response up in fastapi.routing on every request,
+    so wrapping it there covers every route.
+    """
+    import fastapi.routing
+
+    original = fastapi.routing.serialize_response
+    if getattr(original, "_timed", False):
+        return
+
+    async def serialize_response(*args, **kwargs):
+        with phase("serialization"):
+            return await original(*args, **kwargs)
+
+    serialize_response._timed = True
+    fastapi.routing.serialize_response = serialize_response
+
+
+def timed_dependency(name: str, dependency):
+    """
+    `dependency` timed as phase `name`; install it with app.dependency_overrides
+    so every route depending on it, directly or through another dependency, is
+    covered. FastAPI reads the wrapped function's parameters through @wraps.
+    """
+
+    @wraps(dependency)
+    async def timed(*args, **kwargs):
+        with phase(name):
+            return await dependency(*args, **kwargs)
+
+    return timed
+
+
+class ServerTimingMiddleware:
+    PHASES = ("auth", "db", "serialization", "json")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        from app.db.query_stats import begin_request, current_stats
+
+        began = time.perf_counter()
+        timings: Dict[str, float] = {}
+        _timings.set(timings)
+        stats = current_stats() or begin_request()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timings["db"] = stats.total_seconds
+                parts = []
+                for name in self.PHASES:
+                    entry = f"{name};dur={timings.get(name, 0.0) * 1000:.2f}"
+                    if name == "db":
+                        entry += f';desc="{stats.count} queries"'
+                    parts.append(entry)
+                parts.append(f"total;dur={(time.perf_counter() - began) * 1000:.2f}")
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"server-timing", ", ".join(parts).encode()),
+                ]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+
+# ─── Sampling profiler ──────────────────────────────────────────
+
+PROFILE_ID = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+# Leaf frames of a thread parked on a lock, queue or selector
+IDLE_FRAMES = {"select", "poll", "wait", "_worker", "_wait_for_tstate_lock"}
+
+
+class SamplingProfiler:
+    """
+    Samples Python stacks on a timer and aggregates identical ones. The
+    thread `thread_id` (the event loop) is sampled even when idle, so time
+    spent awaiting shows up as its selector; other threads only when busy.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (ident != self.thread_id and frame.f_code.co_name in IDLE_FRAMES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[tuple(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """Collapsed stacks, root first: `frame;frame;frame count` per line."""
+        return "".join(f"{';'.join(stack)} {n}\n" for stack, n in self.samples.most_common())
+
+
+class ProfileStore:
+    """Profiles on disk (shared by all workers), keeping the newest `max_profiles`."""
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def new_id(self) -> str:
+        return f"{int(time.time() * 1000)}-{secrets.token_hex(4)}"
+
+    def save(self, profile_id: str, folded: str, meta: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{profile_id}.folded"), "w") as f:
+            f.write(folded)
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w") as f:
+            json.dump({"id": profile_id, **meta}, f)
+        self._prune()
+
+    def _prune(self):
+        ids = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+        for profile_id in ids[:-self.max_profiles] if len(ids) > self.max_profiles else []:
+            for suffix in (".json", ".folded"):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + suffix))
+                except OSError:
+                    pass
+
+    def list(self) -> List[dict]:
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, name)) as f:
+                        profiles.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return profiles
+
+    def path(self, profile_id: str) -> Optional[str]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.folded")
+        return path if os.path.exists(path) else None
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_STORED)
+
+
+class ProfilerMiddleware:
+    """Profiles requests carrying `X-Profile: 1` and a super admin token; one at a time per worker."""
+
+    def __init__(self, app, store: ProfileStore, interval: float = 0.001):
+        self.app = app
+        self.store = store
+        self.interval = interval
+        self._busy = threading.Lock()
+
+    def _requested_by_super_admin(self, scope) -> bool:
+        headers = dict(scope.get("headers", []))
+        if headers.get(b"x-profile", b"").lower() not in (b"1", b"true"):
+            return False
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if not authorization.lower().startswith("bearer "):
+            return False
+        from app.core.security import token_cache
+
+        payload = token_cache.decode(authorization[7:])
+        return payload is not None and payload.get("restaurant_id") is None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested_by_super_admin(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.store.new_id()
+        status = [500]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode()),
+                ]}
+            await send(message)
+
+        profiler = SamplingProfiler(threading.get_ident(), self.interval)
+        began = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = round((time.perf_counter() - began) * 1000, 2)
+            try:
+                # Joining the sampler and writing/pruning the files block, so
+                # neither runs on the event loop
+                await asyncio.to_thread(profiler.stop)
+                await asyncio.to_thread(self.store.save, profile_id, profiler.folded(), {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": status[0],
+                    "duration_ms": duration_ms,
+                    "samples": sum(profiler.samples.values()),
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                })
+            finally:
+                self._busy.release()
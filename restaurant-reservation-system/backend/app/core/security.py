@@ -1,5 +1,11 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+import asyncio
+import hashlib
+import threading
+import time
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -8,7 +14,14 @@ from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max pin the cost: verify_and_update flags any hash made with a different one
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/admin/login", auto_error=False)
 
 
@@ -20,6 +33,67 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordPoolBusy(Exception):
+    """More logins are running or queued than PASSWORD_HASH_MAX_PENDING allows."""
+
+
+class PasswordVerifier:
+    """
+    Runs bcrypt on its own small thread pool (bcrypt releases the GIL), so a
+    burst of logins is limited to `workers` cores and never occupies the
+    threadpool that serves everything else. Beyond `max_pending` logins in
+    flight new ones are refused instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(matches, new_hash); new_hash is set when the stored hash uses another cost."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusy()
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            ok, new_hash = await loop.run_in_executor(
+                self._executor, pwd_context.verify_and_update, plain_password, hashed_password
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+        with self._lock:
+            self.verified += 1
+            if new_hash:
+                self.rehashed += 1
+        return ok, new_hash
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "verified": self.verified,
+                "rehashed": self.rehashed,
+                "rejected": self.rejected,
+            }
+
+
+password_verifier = PasswordVerifier(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -35,10 +109,103 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
+class VerifiedTokenCache:
+    """
+    Payloads of tokens whose signature was already verified, keyed by the
+    token's SHA-256 so raw tokens are not kept in memory. Entries expire at the
+    token's own `exp` and are evicted least-recently-used past max_entries.
+    Only valid tokens are cached; a rejected token is verified again each time.
+    """
+
+    def __init__(self, enabled: bool = True, max_entries: int = 1024):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def decode(self, token: str) -> Optional[dict]:
+        if not self.enabled:
+            return decode_access_token(token)
+        key = hashlib.sha256(token.encode()).hexdigest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(payload)
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        payload = decode_access_token(token)
+        if payload is None or "exp" not in payload:
+            return payload
+        with self._lock:
+            self._entries[key] = (float(payload["exp"]), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return dict(payload)
+
+    def clear(self) -> int:
+        with self._lock:
+            flushed = len(self._entries)
+            self._entries.clear()
+        return flushed
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+token_cache = VerifiedTokenCache(
+    enabled=settings.TOKEN_CACHE_ENABLED,
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+)
+
+
 async def get_current_admin(token: str = Depends(oauth2_scheme)):
     if token is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    payload = decode_access_token(token)
+    payload = token_cache.decode(token)
     if payload is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     return payload
+
+
+def has_restaurant_access(admin: dict, restaurant_id: int) -> bool:
+    """Super admins (no restaurant in the token) reach every restaurant, others only their own."""
+    admin_rest_id = admin.get("restaurant_id")
+    return admin_rest_id is None or admin_rest_id == restaurant_id
+
+
+def check_restaurant_access(admin: dict, restaurant_id: int):
+    if not has_restaurant_access(admin, restaurant_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only manage your own restaurant")
+
+
+async def get_restaurant_admin(restaurant_id: int, admin: dict = Depends(get_current_admin)) -> dict:
+    """
+    Dependency for routes with a {restaurant_id} path parameter: the scope
+    check needs only the token, so it runs before any query.
+    """
+    check_restaurant_access(admin, restaurant_id)
+    return admin
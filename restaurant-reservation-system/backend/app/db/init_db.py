@@ -1,35 +1,73 @@
-from app.db.session import Base, engine, get_db
+"""
+Schema migration and demo data, run once per deploy rather than on every
+worker start:
+
+    python -m app.db.init_db              # alembic upgrade head, then seed
+    python -m app.db.init_db --no-schema  # seed only (schema migrated separately)
+"""
+import argparse
+import os
+import re
+import time
+
+from sqlalchemy import inspect, insert, select
+
+from app.db.session import engine, get_sync_db
 from app.core.security import get_password_hash
-from sqlalchemy.orm import Session
+
+SUPER_ADMIN_EMAIL = "admin@admin.com"
+DEMO_PASSWORD = "admin123"
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BASE_REVISION = "0001_initial_schema"
 
 
 def init_db():
-    from app.models import location, restaurant, table, reservation, table_block, admin_user
-    Base.metadata.create_all(bind=engine)
+    """
+    Migrates the schema to the newest Alembic revision, which on PostgreSQL
+    includes the overlap constraints of 0002. A database created by
+    create_all before migrations existed is stamped with the base revision
+    first; the later revisions skip what such a database already has.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    tables = inspect(engine).get_table_names()
+    if "alembic_version" not in tables and "reservations" in tables:
+        command.stamp(config, BASE_REVISION)
+    command.upgrade(config, "head")
 
 
 def seed_db():
-    """Seed the database with initial data."""
+    """Seed the database with initial data. Safe to run again: seeded parts are skipped."""
     from app.models.admin_user import AdminUser
     from app.models.location import Location
     from app.models.restaurant import Restaurant
     from app.models.table import Table
 
-    db = next(get_db())
+    db = next(get_sync_db())
     try:
+        # One round trip tells whether anything is left to seed
+        has_locations, has_super_admin = db.execute(select(
+            select(Location.id).exists().label("locations"),
+            select(AdminUser.id).where(AdminUser.email == SUPER_ADMIN_EMAIL).exists().label("super_admin"),
+        )).one()
+        if has_locations and has_super_admin:
+            return
+
+        # All demo admins share one password: bcrypt it once, not once per row
+        password_hash = get_password_hash(DEMO_PASSWORD)
+
         # Create default admin if none exists
-        admin = db.query(AdminUser).filter(AdminUser.email == "admin@admin.com").first()
-        if not admin:
-            admin = AdminUser(
-                email="admin@admin.com",
-                password_hash=get_password_hash("admin123"),
-                role="admin",
-            )
-            db.add(admin)
+        if not has_super_admin:
+            db.add(AdminUser(email=SUPER_ADMIN_EMAIL, password_hash=password_hash, role="admin"))
             db.commit()
 
         # Seed locations
-        if db.query(Location).count() == 0:
+        if not has_locations:
             location_names = [
                 "Sahil", "Icherisheher", "Yasamal", "Nasimi",
                 "Narimanov", "Sabail", "Khatai", "Ahmadli",
@@ -38,12 +76,10 @@ def seed_db():
             ]
             locations = [Location(name=n) for n in location_names]
             db.add_all(locations)
-            db.commit()
+            db.flush()
 
-            # Fetch locations for FK references
-            loc = {}
-            for l in db.query(Location).all():
-                loc[l.name] = l.id
+            # Ids are filled in by the batched INSERT ... RETURNING
+            loc = {l.name: l.id for l in locations}
 
             # ── Restaurant data: (name, location_key, address, phone) ──
             restaurant_data = [
@@ -130,10 +166,10 @@ def seed_db():
                 for name, loc_key, addr, phone in restaurant_data
             ]
             db.add_all(restaurants)
-            db.commit()
+            db.flush()
 
             # ── Unique table layouts per restaurant ──
-            all_restaurants = db.query(Restaurant).all()
+            all_restaurants = restaurants
 
             # fmt: off
             table_layouts = {
@@ -659,26 +695,45 @@ def seed_db():
                     for t in table_layouts[rest.name]:
                         t.restaurant_id = rest.id
                     db.add_all(table_layouts[rest.name])
-            db.commit()
+            db.flush()
 
             # ── Create one admin per restaurant ──
-            import re
+            admin_emails = {}
             for rest in all_restaurants:
                 # Generate email from restaurant name: "Firuze Restaurant — Fountain Square" → "firuze-restaurant-fountain-square@resres.az"
                 slug = re.sub(r"[^a-z0-9]+", "-", rest.name.lower().replace("—", "").replace("'", "")).strip("-")
-                admin_email = f"{slug}@resres.az"
-                existing = db.query(AdminUser).filter(AdminUser.email == admin_email).first()
-                if not existing:
-                    db.add(AdminUser(
-                        email=admin_email,
-                        password_hash=get_password_hash("admin123"),
-                        role="admin",
-                        restaurant_id=rest.id,
-                    ))
+                admin_emails[f"{slug}@resres.az"] = rest.id
+            existing = set(db.scalars(select(AdminUser.email).where(AdminUser.email.in_(admin_emails))))
+            rows = [
+                {"email": email, "password_hash": password_hash, "role": "admin", "restaurant_id": rid}
+                for email, rid in admin_emails.items()
+                if email not in existing
+            ]
+            if rows:
+                db.execute(insert(AdminUser), rows)
             db.commit()
 
     except Exception as e:
         db.rollback()
         print(f"Seed error: {e}")
+        raise
     finally:
         db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--no-schema", action="store_true", help="skip the migration (run separately)")
+    parser.add_argument("--no-seed", action="store_true", help="only migrate the schema")
+    args = parser.parse_args()
+
+    began = time.perf_counter()
+    if not args.no_schema:
+        init_db()
+    if not args.no_seed:
+        seed_db()
+    print(f"Database ready in {time.perf_counter() - began:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
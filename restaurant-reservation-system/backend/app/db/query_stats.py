@@ -0,0 +1,161 @@
+"""
+Per-request SQL statistics from SQLAlchemy engine events.
+
+Every statement executed on the app's engines is timed into the
+resres_db_query_duration_seconds histogram, and counted and timed against
+the QueryStats of the current request (a context variable set by
+QueryStatsMiddleware) and against any open capture_queries() block. A
+statement shape (the SQL text with IN-lists collapsed) that repeats within
+one request is reported as a suspected N+1.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event
+
+from app.core.metrics import DB_QUERY_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# "IN (?, ?, ?)", "IN ($1, $2)", "IN (%(a_1)s, %(a_2)s)" all become "IN (...)"
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%\(\w+\)s|%s)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s|%s))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float):
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """(shape, times) for every statement shape run at least `threshold` times."""
+        with self._lock:
+            return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_captures: List[QueryStats] = []
+_captures_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_stats_started", None)
+    elapsed = time.perf_counter() - started if started is not None else 0.0
+    DB_QUERY_LATENCY.observe(elapsed)
+    stats = _current.get()
+    if stats is None and not _captures:
+        return
+    if stats is not None:
+        stats.record(statement, elapsed)
+    with _captures_lock:
+        captures = list(_captures)
+    for capture in captures:
+        capture.record(statement, elapsed)
+
+
+def instrument(engine):
+    """Attaches the counters to a sync Engine (pass async_engine.sync_engine for async ones)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def begin_request() -> QueryStats:
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def capture_queries():
+    """
+    Collects every statement run on any instrumented engine while the block
+    is open, whichever thread or task runs it. Meant for tests and scripts
+    that drive one request at a time (TestClient runs the app on another
+    thread, out of reach of the request context).
+    """
+    stats = QueryStats()
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = ""):
+    """
+    Fails with AssertionError when the block runs more than `limit` statements:
+
+        with assert_max_queries(4, "availability"):
+            client.get(f"/restaurants/{rid}/availability", params={"date": day})
+    """
+    with capture_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        shapes = "\n".join(f"  {n}x {shape[:160]}" for shape, n in stats.shapes.most_common())
+        raise AssertionError(f"{label or 'block'} ran {stats.count} queries, limit is {limit}:\n{shapes}")
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware (dev mode) that opens a QueryStats for every HTTP request,
+    adds X-DB-Query-Count, X-DB-Time-Ms and X-DB-Suspected-N-Plus-One headers
+    to the response and logs the repeated statements.
+    """
+
+    def __init__(self, app, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = begin_request()
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                repeated = stats.repeated(self.n_plus_one_threshold)
+                headers = list(message.get("headers", []))
+                headers += [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.total_seconds * 1000:.2f}".encode()),
+                    (b"x-db-suspected-n-plus-one", str(len(repeated)).encode()),
+                ]
+                message = {**message, "headers": headers}
+                for shape, n in repeated:
+                    logger.warning("Suspected N+1 in %s %s: %dx %s", scope["method"], scope["path"], n, shape[:300])
+            await send(message)
+
+        await self.app(scope, receive, send_with_stats)
@@ -1,14 +1,265 @@
+from contextlib import asynccontextmanager
+from contextvars import copy_context
+from functools import partial
+from typing import Dict, Optional
+import threading
+import time
+
+import anyio
+from fastapi import Request, Response
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.core.config import settings
+from app.db.pool import engine_options
+from app.db.query_stats import instrument
 
-engine = create_engine(settings.DATABASE_URL)
+# Sync engine: scripts, seed_db, migrations and DB_ASYNC=false
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Maps a sync DATABASE_URL onto the matching asyncio driver."""
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[parsed.drivername])
+    return parsed.render_as_string(hide_password=False)
+
+
+# Async engine: the API routers. Objects stay usable after commit because
+# lazy loads are not possible outside the session's greenlet.
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **engine_options(settings.DATABASE_URL, is_async=True),
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# DB_ASYNC=false: a sync Session on a worker thread behind the same interface
+ThreadedSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+class ThreadedSession:
+    """
+    Exposes the AsyncSession methods the routers use on top of a sync Session,
+    running every database call on the shared worker threadpool that sync
+    handlers use. Like a sync handler, an open session holds one of the
+    threadpool's tokens (40 by default) until it closes, so no more sessions
+    are open than the pre-async mode had threads. Its calls run one at a time
+    under the session's own limiter, so a session that holds a pooled
+    connection never waits for a token.
+    Lets the same handlers run in the pre-async mode for comparison.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+        self._limiter = anyio.CapacityLimiter(1)
+
+    async def _call(self, fn, *args, **kwargs):
+        # The request's context (query stats) goes along to the worker thread
+        return await anyio.to_thread.run_sync(
+            copy_context().run, partial(fn, *args, **kwargs), limiter=self._limiter
+        )
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    def get_bind(self, *args, **kwargs):
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await self._call(self.sync_session.execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._call(self.sync_session.scalar, *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await self._call(self.sync_session.scalars, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._call(self.sync_session.get, *args, **kwargs)
+
+    async def delete(self, instance):
+        await self._call(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await self._call(self.sync_session.flush)
+
+    async def commit(self):
+        await self._call(self.sync_session.commit)
+
+    async def rollback(self):
+        await self._call(self.sync_session.rollback)
+
+    async def refresh(self, instance, *args, **kwargs):
+        await self._call(self.sync_session.refresh, instance, *args, **kwargs)
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        nested = await self._call(self.sync_session.begin_nested)
+        try:
+            yield nested
+        except BaseException:
+            await self._call(nested.rollback)
+            raise
+        else:
+            await self._call(nested.commit)
+
+    async def stream(self, *args, **kwargs):
+        result = await self._call(self.sync_session.execute, *args, **kwargs)
+        return ThreadedStream(self, result)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await self._call(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await self._call(self.sync_session.close)
+
+
+class ThreadedStream:
+    """AsyncResult.partitions() over a streaming sync Result, fetched through the session."""
+
+    def __init__(self, session: ThreadedSession, result):
+        self._session = session
+        self._result = result
+
+    async def partitions(self, size: Optional[int] = None):
+        partitions = self._result.partitions(size)
+        while True:
+            rows = await self._session._call(next, partitions, None)
+            if rows is None:
+                return
+            yield rows
+
+
+# ─── Read replica ───────────────────────────────────────────────
+
+# Optional engines for READ_DATABASE_URL; without it reads use the primary
+if settings.READ_DATABASE_URL:
+    read_engine = create_engine(settings.READ_DATABASE_URL, **engine_options(settings.READ_DATABASE_URL))
+    read_async_engine = create_async_engine(
+        async_database_url(settings.READ_DATABASE_URL),
+        **engine_options(settings.READ_DATABASE_URL, is_async=True),
+    )
+    ReadAsyncSessionLocal = async_sessionmaker(bind=read_async_engine, autoflush=False, expire_on_commit=False)
+    ReadThreadedSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine
+    )
+else:
+    read_engine = None
+    read_async_engine = None
+
+for _engine in (engine, async_engine.sync_engine, read_engine, read_async_engine and read_async_engine.sync_engine):
+    if _engine is not None:
+        instrument(_engine)
+
+PRIMARY_UNTIL_COOKIE = "resres_primary_until"
+
+
+class ReadAfterWriteGuard:
+    """
+    Remembers which restaurants were written to in the last
+    READ_AFTER_WRITE_SECONDS. Reads about them go to the primary until the
+    replica has had time to catch up, so nothing stale is served or cached.
+    The writing guest also gets a cookie with the same deadline, which covers
+    their next requests even when another worker process serves them.
+    """
+
+    def __init__(self, window_seconds: float = 5.0):
+        self.window_seconds = window_seconds
+        self._written: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def record_write(self, restaurant_id: int):
+        now = time.monotonic()
+        with self._lock:
+            self._written[restaurant_id] = now + self.window_seconds
+            if len(self._written) > 1024:
+                self._written = {rid: until for rid, until in self._written.items() if until > now}
+
+    def recently_written(self, restaurant_id: int) -> bool:
+        with self._lock:
+            until = self._written.get(restaurant_id)
+        return until is not None and until > time.monotonic()
+
+    def mark_response(self, response: Response, restaurant_id: int):
+        self.record_write(restaurant_id)
+        response.set_cookie(
+            PRIMARY_UNTIL_COOKIE,
+            str(int(time.time() + self.window_seconds) + 1),
+            max_age=int(self.window_seconds) + 1,
+            httponly=True,
+            samesite="lax",
+        )
+
+    def needs_primary(self, request: Request) -> bool:
+        try:
+            if float(request.cookies.get(PRIMARY_UNTIL_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        restaurant_id = request.path_params.get("restaurant_id")
+        return restaurant_id is not None and self.recently_written(int(restaurant_id))
+
+
+read_after_write = ReadAfterWriteGuard(window_seconds=settings.READ_AFTER_WRITE_SECONDS)
+
+
+@asynccontextmanager
+async def db_session(read: bool = False):
+    """
+    A session in the configured mode (async or threaded). read=True uses the
+    replica when one is configured; callers decide whether that is safe.
+    """
+    use_replica = read and read_async_engine is not None
+    if settings.DB_ASYNC:
+        async with (ReadAsyncSessionLocal if use_replica else AsyncSessionLocal)() as db:
+            yield db
+    else:
+        threads = anyio.to_thread.current_default_thread_limiter()
+        db = ThreadedSession((ReadThreadedSessionLocal if use_replica else ThreadedSessionLocal)())
+        await threads.acquire_on_behalf_of(db)
+        try:
+            yield db
+        finally:
+            try:
+                await db.close()
+            finally:
+                threads.release_on_behalf_of(db)
+
+
+async def get_db():
+    async with db_session() as db:
+        yield db
+
+
+async def get_read_db(request: Request):
+    """
+    Session for read-only handlers: the replica, unless the request must see a
+    recent write. That decision is left in request.state.needs_primary for
+    handlers with a response cache, which another worker may not have
+    invalidated yet.
+    """
+    request.state.needs_primary = read_after_write.needs_primary(request)
+    async with db_session(read=not request.state.needs_primary) as db:
+        yield db
+
 
-def get_db():
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
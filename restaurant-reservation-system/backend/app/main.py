@@ -6,29 +6,72 @@ from app.api.restaurants import router as restaurants_router
 from app.api.reservations import router as reservations_router
 from app.api.admin import router as admin_router
 from app.api.messages import router as messages_router
-from app.db.init_db import init_db, seed_db
+from app.api.search import router as search_router
+from app.api.metrics import router as metrics_router
+from app.core.config import settings
+from app.core.security import get_current_admin
+from app.core.metrics import MetricsMiddleware, exporter
+from app.core.profiling import (
+    ProfilerMiddleware,
+    ServerTimingMiddleware,
+    TimedJSONResponse,
+    install_serialization_timing,
+    profile_store,
+    timed_dependency,
+)
+from app.db.query_stats import QueryStatsMiddleware
 
-app = FastAPI(title="Restaurant Reservation System")
+app = FastAPI(title="Restaurant Reservation System", default_response_class=TimedJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=[origin.strip() for origin in settings.CORS_ORIGINS.split(",") if origin.strip()],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Readable by the admin page, which follows the reservation pages
+    expose_headers=["X-Next-Cursor"],
 )
 
+if settings.SERVER_TIMING_ENABLED:
+    # Inside QueryStatsMiddleware, so both read the same per-request QueryStats
+    install_serialization_timing()
+    app.dependency_overrides[get_current_admin] = timed_dependency("auth", get_current_admin)
+    app.add_middleware(ServerTimingMiddleware)
+
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=settings.QUERY_STATS_N_PLUS_ONE_THRESHOLD)
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilerMiddleware, store=profile_store, interval=settings.PROFILE_SAMPLE_INTERVAL_MS / 1000,
+    )
+
+if settings.METRICS_ENABLED:
+    # Outermost, so the recorded latency covers every other middleware too
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(locations_router, tags=["Locations"])
 app.include_router(restaurants_router, tags=["Restaurants"])
 app.include_router(reservations_router, tags=["Reservations"])
 app.include_router(admin_router, tags=["Admin"])
 app.include_router(messages_router, tags=["Messages"])
+app.include_router(search_router, tags=["Search"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 
 @app.on_event("startup")
-def on_startup():
-    init_db()
-    seed_db()
+def start_metrics_exporter():
+    # Runs in each worker process after the fork; no-op without METRICS_DIR
+    if settings.METRICS_ENABLED:
+        exporter.start()
+
+
+@app.on_event("shutdown")
+def stop_metrics_exporter():
+    if settings.METRICS_ENABLED:
+        exporter.stop()
 
 
 @app.get("/")
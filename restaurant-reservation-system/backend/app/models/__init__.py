@@ -3,5 +3,6 @@ from app.models.restaurant import Restaurant
 from app.models.table import Table
 from app.models.reservation import Reservation
 from app.models.table_block import TableBlock
+from app.models.table_block_rule import TableBlockRule, TableBlockRuleException
 from app.models.admin_user import AdminUser
 from app.models.user_message import UserMessage
@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time, Index
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
 
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        Index("ix_reservations_table_id_date", "table_id", "date"),
+        # Admin list: keyset order (date, start_time, id), optionally scoped by restaurant and status
+        Index("ix_reservations_date_start_time_id", "date", "start_time", "id"),
+        Index("ix_reservations_restaurant_id_date_start_time_id", "restaurant_id", "date", "start_time", "id"),
+        Index(
+            "ix_reservations_restaurant_id_status_date_start_time_id",
+            "restaurant_id", "status", "date", "start_time", "id",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
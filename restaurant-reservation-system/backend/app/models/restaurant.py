@@ -8,10 +8,11 @@ class Restaurant(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False, index=True)
     address = Column(String, nullable=True)
     phone = Column(String, nullable=True)
     floor_shape = Column(Text, nullable=True)  # JSON string: SVG path or polygon points for restaurant outline
+    layout_version = Column(Integer, nullable=False, default=1, server_default="1")  # bumped on every floor-plan change
 
     location = relationship("Location", back_populates="restaurants")
     tables = relationship("Table", back_populates="restaurant", cascade="all, delete-orphan")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -7,7 +7,7 @@ class Table(Base):
     __tablename__ = "tables"
 
     id = Column(Integer, primary_key=True, index=True)
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     capacity = Column(Integer, nullable=False, default=4)
     position_x = Column(Integer, nullable=False, default=0)
@@ -18,7 +18,9 @@ class Table(Base):
     zone = Column(String, nullable=True)  # Window, Front, Patio, Center, Terrace, Bar, VIP, etc.
     manual_status = Column(String, nullable=True)  # null = auto, "occupied", "empty", "blocked"
     manual_status_date = Column(String, nullable=True)  # date the manual status applies to (YYYY-MM-DD)
+    archived_at = Column(DateTime, nullable=True)  # deleted but kept for its reservation history; hidden everywhere
 
     restaurant = relationship("Restaurant", back_populates="tables")
     reservations = relationship("Reservation", back_populates="table", cascade="all, delete-orphan")
     blocks = relationship("TableBlock", back_populates="table", cascade="all, delete-orphan")
+    block_rules = relationship("TableBlockRule", back_populates="table", cascade="all, delete-orphan")
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time, Index
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
 
 class TableBlock(Base):
     __tablename__ = "table_blocks"
+    __table_args__ = (
+        Index("ix_table_blocks_table_id_date", "table_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
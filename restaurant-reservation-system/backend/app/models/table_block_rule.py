@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time, Index
+from sqlalchemy.orm import relationship
+from app.db.session import Base
+
+
+class TableBlockRule(Base):
+    """
+    A block that repeats instead of being stored per date: every day, or every
+    given weekday, between start_date and end_date (open-ended when null),
+    skipping the dates listed as exceptions.
+    """
+    __tablename__ = "table_block_rules"
+    __table_args__ = (
+        # One date probes (table_id, weekday) and (table_id, NULL) and ranges on start_date
+        Index("ix_table_block_rules_table_id_weekday_start_date", "table_id", "weekday", "start_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False, index=True)
+    frequency = Column(String, nullable=False)  # daily or weekly
+    weekday = Column(Integer, nullable=True)  # 0 = Monday ... 6 = Sunday, weekly rules only
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    reason = Column(String, nullable=True)
+
+    table = relationship("Table", back_populates="block_rules")
+    exceptions = relationship(
+        "TableBlockRuleException", back_populates="rule", cascade="all, delete-orphan", lazy="selectin"
+    )
+
+
+class TableBlockRuleException(Base):
+    __tablename__ = "table_block_rule_exceptions"
+
+    rule_id = Column(Integer, ForeignKey("table_block_rules.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+
+    rule = relationship("TableBlockRule", back_populates="exceptions")
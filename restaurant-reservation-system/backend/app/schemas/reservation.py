@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import datetime
 
 
@@ -34,3 +34,34 @@ class ReservationOut(BaseModel):
 
 class ReservationUpdate(BaseModel):
     status: str  # confirmed, cancelled, declined
+
+
+class ReservationBulkUpdate(BaseModel):
+    ids: List[int]
+    status: str  # confirmed, cancelled, declined
+
+
+class ReservationBulkItem(BaseModel):
+    id: int
+    ok: bool
+    detail: Optional[str] = None
+
+
+class ReservationBulkResult(BaseModel):
+    status: str
+    updated: int
+    results: List[ReservationBulkItem]
+
+
+class SlotSuggestion(BaseModel):
+    table_id: int
+    table_name: str
+    capacity: int
+    date: datetime.date
+    start_time: datetime.time
+    end_time: datetime.time
+
+
+class ReservationConflict(BaseModel):
+    detail: str
+    suggestions: List[SlotSuggestion] = []
@@ -9,6 +9,7 @@ class RestaurantOut(BaseModel):
     address: Optional[str] = None
     phone: Optional[str] = None
     floor_shape: Optional[str] = None
+    layout_version: int = 1
 
     class Config:
         from_attributes = True
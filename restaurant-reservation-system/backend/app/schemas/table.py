@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+import datetime
 
 
 class TableCreate(BaseModel):
@@ -25,6 +26,29 @@ class TableUpdate(BaseModel):
     zone: Optional[str] = None
 
 
+class FloorPlanTableCreate(BaseModel):
+    name: str
+    capacity: int = 4
+    position_x: int = 0
+    position_y: int = 0
+    width: int = 100
+    height: int = 80
+    shape: str = "rect"
+    zone: Optional[str] = None
+
+
+class FloorPlanTableUpdate(TableUpdate):
+    id: int
+
+
+class FloorPlanSave(BaseModel):
+    layout_version: int  # version the editor loaded; the save fails if it moved on
+    floor_shape: Optional[str] = None
+    create: List[FloorPlanTableCreate] = []
+    update: List[FloorPlanTableUpdate] = []
+    delete: List[int] = []
+
+
 class TableOut(BaseModel):
     id: int
     restaurant_id: int
@@ -56,3 +80,35 @@ class TableAvailability(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TableSearchResult(BaseModel):
+    id: int
+    restaurant_id: int
+    restaurant_name: str
+    name: str
+    capacity: int
+    zone: Optional[str] = None
+
+
+class TableDayStatus(BaseModel):
+    table_id: int
+    status: str  # available, pending, reserved, blocked
+
+
+class DayAvailability(BaseModel):
+    date: datetime.date
+    total_tables: int
+    available: int
+    pending: int
+    reserved: int
+    blocked: int
+    level: str  # free, filling_up, full
+    tables: Optional[List[TableDayStatus]] = None
+
+
+class FloorPlanOut(BaseModel):
+    restaurant_id: int
+    layout_version: int
+    floor_shape: Optional[str] = None
+    tables: List[TableOut]
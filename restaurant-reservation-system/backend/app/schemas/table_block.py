@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, field_validator
+from typing import List, Optional
 import datetime
 
 
@@ -23,3 +23,42 @@ class TableBlockOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TableBlockRuleCreate(BaseModel):
+    table_id: int
+    restaurant_id: int
+    frequency: str  # daily or weekly
+    weekday: Optional[int] = None  # 0 = Monday ... 6 = Sunday, required for weekly
+    start_date: datetime.date
+    end_date: Optional[datetime.date] = None  # open-ended when omitted
+    start_time: datetime.time
+    end_time: datetime.time
+    reason: Optional[str] = None
+    exceptions: List[datetime.date] = []
+
+
+class TableBlockRuleExceptionCreate(BaseModel):
+    date: datetime.date
+
+
+class TableBlockRuleOut(BaseModel):
+    id: int
+    table_id: int
+    restaurant_id: int
+    frequency: str
+    weekday: Optional[int] = None
+    start_date: datetime.date
+    end_date: Optional[datetime.date] = None
+    start_time: datetime.time
+    end_time: datetime.time
+    reason: Optional[str] = None
+    exceptions: List[datetime.date] = []
+
+    @field_validator("exceptions", mode="before")
+    @classmethod
+    def exception_dates(cls, value):
+        return sorted(getattr(e, "date", e) for e in value)
+
+    class Config:
+        from_attributes = True
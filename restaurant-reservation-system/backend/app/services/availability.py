@@ -1,9 +1,15 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
 import datetime
 
+from app.core.config import settings
 from app.models.reservation import Reservation
 from app.models.table_block import TableBlock
+from app.services.block_rules import get_rule_intervals, get_rule_range_activity, has_rule_overlap
+from app.services.occupancy_index import occupancy_index
 
 
 def check_time_overlap(
@@ -16,8 +22,14 @@ def check_time_overlap(
 ) -> bool:
     """
     Returns True if there is a time conflict (overlap) for the given table on a date.
-    Checks both reservations and table blocks.
+    Checks reservations, table blocks and recurring block rules.
+    Answered from the occupancy index when it is enabled.
     """
+    if occupancy_index.enabled:
+        return occupancy_index.has_overlap(
+            db, table_id, date, start_time, end_time, exclude_reservation_id
+        )
+
     # Check reservation overlaps
     reservation_query = db.query(Reservation).filter(
         and_(
@@ -47,7 +59,132 @@ def check_time_overlap(
     if block_query.first():
         return True
 
-    return False
+    # Check recurring block rules in force on this date
+    return has_rule_overlap(db, table_id, date, start_time, end_time)
+
+
+MANUAL_STATUS_MAP = {"occupied": "reserved", "empty": "available", "blocked": "blocked"}
+
+
+def get_range_activity(
+    db: Session,
+    table_ids: List[int],
+    start_date: datetime.date,
+    end_date: datetime.date,
+) -> Dict[datetime.date, Tuple[Set[int], Set[int], Set[int]]]:
+    """
+    Collects, for a set of tables over an inclusive date range, which tables
+    have any block, any confirmed reservation and any pending reservation on
+    each date. Runs two grouped queries regardless of table count or range size;
+    both are served by the (table_id, date) indexes.
+    """
+    activity: Dict[datetime.date, Tuple[Set[int], Set[int], Set[int]]] = {}
+    if not table_ids:
+        return activity
+
+    def day(d: datetime.date) -> Tuple[Set[int], Set[int], Set[int]]:
+        if d not in activity:
+            activity[d] = (set(), set(), set())
+        return activity[d]
+
+    block_rows = (
+        db.query(TableBlock.table_id, TableBlock.date)
+        .filter(
+            TableBlock.table_id.in_(table_ids),
+            TableBlock.date >= start_date,
+            TableBlock.date <= end_date,
+        )
+        .distinct()
+    )
+    for row in block_rows:
+        day(row.date)[0].add(row.table_id)
+
+    reservation_rows = (
+        db.query(Reservation.table_id, Reservation.date, Reservation.status)
+        .filter(
+            Reservation.table_id.in_(table_ids),
+            Reservation.date >= start_date,
+            Reservation.date <= end_date,
+            Reservation.status.in_(["confirmed", "pending"]),
+        )
+        .distinct()
+    )
+    for row in reservation_rows:
+        if row.status == "confirmed":
+            day(row.date)[1].add(row.table_id)
+        else:
+            day(row.date)[2].add(row.table_id)
+
+    for rule_date, rule_tables in get_rule_range_activity(db, table_ids, start_date, end_date).items():
+        day(rule_date)[0].update(rule_tables)
+
+    return activity
+
+
+def get_day_activity(
+    db: Session,
+    table_ids: List[int],
+    date: datetime.date,
+) -> Tuple[Set[int], Set[int], Set[int]]:
+    """
+    Collects, for a set of tables on one date, which tables have any block,
+    any confirmed reservation and any pending reservation.
+    """
+    if occupancy_index.enabled:
+        blocked: Set[int] = set()
+        confirmed: Set[int] = set()
+        pending: Set[int] = set()
+        for table_id, intervals in occupancy_index.get_many(db, table_ids, date).items():
+            for interval in intervals:
+                if interval.kind in ("block", "rule"):
+                    blocked.add(table_id)
+                elif interval.status == "confirmed":
+                    confirmed.add(table_id)
+                elif interval.status == "pending":
+                    pending.add(table_id)
+        return blocked, confirmed, pending
+
+    activity = get_range_activity(db, table_ids, date, date)
+    return activity.get(date, (set(), set(), set()))
+
+
+def resolve_table_status(
+    table_id: int,
+    date: datetime.date,
+    table_obj,
+    blocked: Set[int],
+    confirmed: Set[int],
+    pending: Set[int],
+) -> str:
+    """
+    Applies the status precedence for one table:
+    manual_status override, then blocked, then reserved, then pending.
+    """
+    if table_obj and table_obj.manual_status and table_obj.manual_status_date == str(date):
+        return MANUAL_STATUS_MAP.get(table_obj.manual_status, table_obj.manual_status)
+    if table_id in blocked:
+        return "blocked"
+    if table_id in confirmed:
+        return "reserved"
+    if table_id in pending:
+        return "pending"
+    return "available"
+
+
+def get_table_statuses(
+    db: Session,
+    tables: List,
+    date: datetime.date,
+) -> Dict[int, str]:
+    """
+    Returns {table_id: status} for every table passed in on a given date.
+    Uses a constant number of queries instead of one probe set per table.
+    """
+    blocked, confirmed, pending = get_day_activity(db, [t.id for t in tables], date)
+    return {
+        t.id: resolve_table_status(t.id, date, t, blocked, confirmed, pending)
+        for t in tables
+    }
 
 
 def get_table_status(
@@ -59,47 +196,241 @@ def get_table_status(
     """
     Returns the status of a table for a given date.
     If the admin has set a manual status for this date, that takes priority.
-    Otherwise shows 'reserved' if any confirmed reservation exists,
-    and 'blocked' if any block exists.
+    Otherwise shows 'blocked' if any block exists, 'reserved' if any
+    confirmed reservation exists and 'pending' if any pending one exists.
     """
-    # Check manual status override (set by admin)
     if table_obj is None:
         from app.models.table import Table
         table_obj = db.query(Table).filter(Table.id == table_id).first()
     if table_obj and table_obj.manual_status and table_obj.manual_status_date == str(date):
-        status_map = {"occupied": "reserved", "empty": "available", "blocked": "blocked"}
-        return status_map.get(table_obj.manual_status, table_obj.manual_status)
+        return MANUAL_STATUS_MAP.get(table_obj.manual_status, table_obj.manual_status)
 
-    # Check if blocked (any block on that date)
-    block = db.query(TableBlock).filter(
-        and_(
-            TableBlock.table_id == table_id,
-            TableBlock.date == date,
-        )
-    ).first()
-    if block:
-        return "blocked"
+    blocked, confirmed, pending = get_day_activity(db, [table_id], date)
+    return resolve_table_status(table_id, date, table_obj, blocked, confirmed, pending)
 
-    # Check if reserved (any confirmed reservation on that date)
-    reservation = db.query(Reservation).filter(
-        and_(
-            Reservation.table_id == table_id,
-            Reservation.date == date,
-            Reservation.status == "confirmed",
-        )
-    ).first()
-    if reservation:
-        return "reserved"
 
-    # Check if pending (any pending reservation on that date)
-    pending = db.query(Reservation).filter(
-        and_(
-            Reservation.table_id == table_id,
-            Reservation.date == date,
-            Reservation.status == "pending",
+MAX_CALENDAR_DAYS = 62
+
+
+def get_availability_calendar(
+    db: Session,
+    tables: List,
+    start_date: datetime.date,
+    end_date: datetime.date,
+    include_tables: bool = False,
+) -> List[dict]:
+    """
+    Returns one aggregate per date in the inclusive range with counts per
+    status and an overall level: 'free', 'filling_up' (half or more of the
+    tables taken) or 'full' (no table available).
+    """
+    activity = get_range_activity(db, [t.id for t in tables], start_date, end_date)
+    empty = (set(), set(), set())
+    total = len(tables)
+
+    days = []
+    current = start_date
+    while current <= end_date:
+        blocked, confirmed, pending = activity.get(current, empty)
+        statuses = {
+            t.id: resolve_table_status(t.id, current, t, blocked, confirmed, pending)
+            for t in tables
+        }
+        counts = {"available": 0, "pending": 0, "reserved": 0, "blocked": 0}
+        for status in statuses.values():
+            counts[status] = counts.get(status, 0) + 1
+
+        if counts["available"] == 0:
+            level = "full"
+        elif counts["available"] * 2 <= total:
+            level = "filling_up"
+        else:
+            level = "free"
+
+        day = {
+            "date": current,
+            "total_tables": total,
+            "available": counts["available"],
+            "pending": counts["pending"],
+            "reserved": counts["reserved"],
+            "blocked": counts["blocked"],
+            "level": level,
+        }
+        if include_tables:
+            day["tables"] = [
+                {"table_id": table_id, "status": status}
+                for table_id, status in statuses.items()
+            ]
+        days.append(day)
+        current += datetime.timedelta(days=1)
+
+    return days
+
+
+DAY_START = datetime.time(0, 0)
+DAY_END = datetime.time(23, 59, 59)
+
+
+def _to_seconds(t: datetime.time) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def _from_seconds(seconds: int) -> datetime.time:
+    return datetime.time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def _suggestion_window(date: datetime.date, now: datetime.datetime = None) -> Tuple[int, int]:
+    """
+    Seconds of the day within which suggested slots may fall: the configured
+    hours, and on the current day only from the next full minute onwards.
+    """
+    start = _to_seconds(max(settings.SUGGESTION_HOURS_START, DAY_START))
+    end = _to_seconds(min(settings.SUGGESTION_HOURS_END, DAY_END))
+    now = now or datetime.datetime.now()
+    if date < now.date():
+        return start, start
+    if date == now.date():
+        start = max(start, _to_seconds(now.time().replace(microsecond=0)) // 60 * 60 + 60)
+    return start, end
+
+
+def suggest_alternative_slots(
+    db: Session,
+    table_obj,
+    date: datetime.date,
+    start_time: datetime.time,
+    end_time: datetime.time,
+    limit: int = 5,
+) -> List[dict]:
+    """
+    Returns the free windows of the requested length closest to the requested
+    start, on the requested table and on tables of the same restaurant that seat
+    at least as many guests. The day's reservations and blocks are loaded once
+    and swept per table; each free gap contributes its start nearest the request.
+    Slots lie within SUGGESTION_HOURS_START/END and, today, after the current time.
+    """
+    from app.models.table import Table
+
+    day_start, day_end = _suggestion_window(date)
+    wanted_start = _to_seconds(start_time)
+    duration = _to_seconds(end_time) - wanted_start
+    if day_end - day_start < duration:
+        return []
+
+    candidates = [
+        t for t in db.query(Table).filter(
+            Table.restaurant_id == table_obj.restaurant_id,
+            Table.archived_at.is_(None),
+            Table.capacity >= table_obj.capacity,
         )
-    ).first()
-    if pending:
-        return "pending"
+        if not (
+            t.manual_status in ("occupied", "blocked")
+            and t.manual_status_date == str(date)
+        )
+    ]
+    if not candidates:
+        return []
+    table_ids = [t.id for t in candidates]
 
-    return "available"
+    busy: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+    reservation_rows = db.query(
+        Reservation.table_id, Reservation.start_time, Reservation.end_time
+    ).filter(
+        Reservation.table_id.in_(table_ids),
+        Reservation.date == date,
+        Reservation.status != "cancelled",
+        Reservation.status != "declined",
+    )
+    block_rows = db.query(
+        TableBlock.table_id, TableBlock.start_time, TableBlock.end_time
+    ).filter(
+        TableBlock.table_id.in_(table_ids),
+        TableBlock.date == date,
+    )
+    rule_rows = get_rule_intervals(db, table_ids, date)
+    for row in list(reservation_rows) + list(block_rows) + rule_rows:
+        busy[row.table_id].append((_to_seconds(row.start_time), _to_seconds(row.end_time)))
+
+    slots = []
+    for table in candidates:
+        cursor = day_start
+        gaps = []
+        for busy_start, busy_end in sorted(busy[table.id]):
+            if busy_start > cursor:
+                gaps.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+        if day_end > cursor:
+            gaps.append((cursor, day_end))
+
+        for gap_start, gap_end in gaps:
+            if gap_end - gap_start < duration:
+                continue
+            slot_start = min(max(wanted_start, gap_start), gap_end - duration)
+            if table.id == table_obj.id and slot_start == wanted_start:
+                continue
+            slots.append((
+                abs(slot_start - wanted_start),
+                table.id != table_obj.id,
+                table.capacity,
+                slot_start,
+                table,
+            ))
+
+    slots.sort(key=lambda s: s[:4])
+    return [
+        {
+            "table_id": table.id,
+            "table_name": table.name,
+            "capacity": table.capacity,
+            "date": date,
+            "start_time": _from_seconds(slot_start),
+            "end_time": _from_seconds(slot_start + duration),
+        }
+        for _, _, _, slot_start, table in slots[:limit]
+    ]
+
+
+# ─── Async entry points ──────────────────────────────────────────
+# The routers hold an AsyncSession; these run the functions above on its
+# underlying sync session inside the session's greenlet, so I/O stays async.
+
+async def check_time_overlap_async(
+    db: AsyncSession,
+    table_id: int,
+    date: datetime.date,
+    start_time: datetime.time,
+    end_time: datetime.time,
+    exclude_reservation_id: int = None,
+) -> bool:
+    return await db.run_sync(
+        check_time_overlap, table_id, date, start_time, end_time, exclude_reservation_id
+    )
+
+
+async def get_table_statuses_async(db: AsyncSession, tables: List, date: datetime.date) -> Dict[int, str]:
+    return await db.run_sync(get_table_statuses, tables, date)
+
+
+async def get_table_status_async(db: AsyncSession, table_id: int, date: datetime.date, table_obj=None) -> str:
+    return await db.run_sync(get_table_status, table_id, date, table_obj)
+
+
+async def get_availability_calendar_async(
+    db: AsyncSession,
+    tables: List,
+    start_date: datetime.date,
+    end_date: datetime.date,
+    include_tables: bool = False,
+) -> List[dict]:
+    return await db.run_sync(get_availability_calendar, tables, start_date, end_date, include_tables)
+
+
+async def suggest_alternative_slots_async(
+    db: AsyncSession,
+    table_obj,
+    date: datetime.date,
+    start_time: datetime.time,
+    end_time: datetime.time,
+    limit: int = 5,
+) -> List[dict]:
+    return await db.run_sync(suggest_alternative_slots, table_obj, date, start_time, end_time, limit)
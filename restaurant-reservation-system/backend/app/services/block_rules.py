@@ -0,0 +1,107 @@
+"""
+Recurring table blocks. Rules are never expanded into TableBlock rows: each
+availability or overlap check asks which rules cover the date it looks at.
+A rule covers a date when the date is inside [start_date, end_date], the rule
+is daily or its weekday matches, and the date is not one of its exceptions.
+"""
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+import datetime
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import Session
+
+from app.models.table_block_rule import TableBlockRule, TableBlockRuleException
+
+
+def rule_applies(date: datetime.date):
+    """
+    SQL condition for the rules in force on a date. The weekday/NULL split keeps
+    the lookup on the (table_id, weekday, start_date) index.
+    """
+    return and_(
+        or_(TableBlockRule.weekday == date.weekday(), TableBlockRule.weekday.is_(None)),
+        TableBlockRule.start_date <= date,
+        or_(TableBlockRule.end_date.is_(None), TableBlockRule.end_date >= date),
+        ~exists().where(
+            TableBlockRuleException.rule_id == TableBlockRule.id,
+            TableBlockRuleException.date == date,
+        ),
+    )
+
+
+def rule_conflict(table_id_column, date: datetime.date, start_time: datetime.time, end_time: datetime.time):
+    """Correlated EXISTS: a rule blocks table_id_column during part of the window."""
+    return exists().where(
+        TableBlockRule.table_id == table_id_column,
+        rule_applies(date),
+        TableBlockRule.start_time < end_time,
+        TableBlockRule.end_time > start_time,
+    )
+
+
+def has_rule_overlap(
+    db: Session,
+    table_id: int,
+    date: datetime.date,
+    start_time: datetime.time,
+    end_time: datetime.time,
+) -> bool:
+    return db.query(rule_conflict(table_id, date, start_time, end_time)).scalar()
+
+
+def get_rule_intervals(
+    db: Session,
+    table_ids: List[int],
+    date: datetime.date,
+) -> List[Tuple[int, int, datetime.time, datetime.time]]:
+    """(rule_id, table_id, start_time, end_time) of every rule in force on a date."""
+    if not table_ids:
+        return []
+    return db.query(
+        TableBlockRule.id, TableBlockRule.table_id, TableBlockRule.start_time, TableBlockRule.end_time
+    ).filter(
+        TableBlockRule.table_id.in_(table_ids),
+        rule_applies(date),
+    ).all()
+
+
+def get_rule_range_activity(
+    db: Session,
+    table_ids: List[int],
+    start_date: datetime.date,
+    end_date: datetime.date,
+) -> Dict[datetime.date, Set[int]]:
+    """
+    {date: table_ids blocked by a rule} over an inclusive range. Loads the
+    rules overlapping the range and their exceptions inside it (two queries)
+    and expands them in memory.
+    """
+    blocked: Dict[datetime.date, Set[int]] = defaultdict(set)
+    if not table_ids:
+        return blocked
+    rules = db.query(
+        TableBlockRule.id, TableBlockRule.table_id, TableBlockRule.weekday,
+        TableBlockRule.start_date, TableBlockRule.end_date,
+    ).filter(
+        TableBlockRule.table_id.in_(table_ids),
+        TableBlockRule.start_date <= end_date,
+        or_(TableBlockRule.end_date.is_(None), TableBlockRule.end_date >= start_date),
+    ).all()
+    if not rules:
+        return blocked
+    skipped = set(
+        db.query(TableBlockRuleException.rule_id, TableBlockRuleException.date).filter(
+            TableBlockRuleException.rule_id.in_([rule.id for rule in rules]),
+            TableBlockRuleException.date >= start_date,
+            TableBlockRuleException.date <= end_date,
+        ).all()
+    )
+    for rule in rules:
+        day = max(start_date, rule.start_date)
+        last = min(end_date, rule.end_date) if rule.end_date else end_date
+        while day <= last:
+            if (rule.weekday is None or rule.weekday == day.weekday()) and (rule.id, day) not in skipped:
+                blocked[day].add(rule.table_id)
+            day += datetime.timedelta(days=1)
+    return blocked
@@ -0,0 +1,70 @@
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Dict
+
+from app.models.reservation import Reservation
+from app.services.availability import check_time_overlap
+from app.services.block_rules import has_rule_overlap
+
+# SQLSTATE raised by the exclusion constraints and overlap triggers (migration 0002)
+EXCLUSION_VIOLATION = "23P01"
+
+_constraints_installed: Dict[str, bool] = {}
+
+
+class BookingConflict(Exception):
+    """The reservation or block overlaps an existing one on the same table."""
+
+
+def is_overlap_violation(exc: IntegrityError) -> bool:
+    return getattr(exc.orig, "pgcode", None) == EXCLUSION_VIOLATION
+
+
+def has_overlap_constraints(db: Session) -> bool:
+    """
+    True when the database enforces overlaps itself: PostgreSQL with the
+    0002_time_range_constraints migration applied. Checked once per database.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+    key = str(bind.url)
+    if key not in _constraints_installed:
+        _constraints_installed[key] = db.execute(
+            text("SELECT 1 FROM pg_constraint WHERE conname = 'reservations_no_overlap'")
+        ).first() is not None
+    return _constraints_installed[key]
+
+
+def insert_without_overlap(db: Session, obj) -> None:
+    """
+    Adds and flushes a Reservation or TableBlock, raising BookingConflict when it
+    overlaps an active reservation or a block of the same table.
+
+    With the database constraints in place this is a single INSERT and the
+    constraint violation is the conflict signal; only recurring block rules are
+    checked first for reservations. Otherwise (SQLite, or Postgres without the
+    migration) the overlap is checked first.
+    """
+    if not has_overlap_constraints(db):
+        if check_time_overlap(db, obj.table_id, obj.date, obj.start_time, obj.end_time):
+            raise BookingConflict()
+    elif isinstance(obj, Reservation):
+        # Recurring block rules are not rows the constraints can see
+        if has_rule_overlap(db, obj.table_id, obj.date, obj.start_time, obj.end_time):
+            raise BookingConflict()
+
+    db.add(obj)
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        db.rollback()
+        if is_overlap_violation(exc):
+            raise BookingConflict() from exc
+        raise
+
+
+async def insert_without_overlap_async(db: AsyncSession, obj) -> None:
+    await db.run_sync(insert_without_overlap, obj)
@@ -0,0 +1,139 @@
+"""
+In-process response cache for the public restaurant read endpoints.
+Entries are keyed by (kind, restaurant_id, date), expire after a TTL and are
+evicted least-recently-used past a size bound. Write paths invalidate the
+affected restaurant (and date, where one applies) right after commit; other
+worker processes see the change at the latest when their entry expires.
+
+A miss takes generation() before reading the database and passes it to
+set(): if the restaurant (or that date) was invalidated in between, the
+result read before the write is served but not stored.
+"""
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+import datetime
+import threading
+import time
+
+from app.core.config import settings
+
+Key = Tuple[str, int, Optional[datetime.date]]
+
+
+class ResponseCache:
+    def __init__(self, enabled: bool = True, max_entries: int = 5000, ttl_seconds: float = 30.0):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Key, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # (restaurant_id, date or None) -> generation of its last invalidation
+        self._invalidated: "OrderedDict[Tuple[int, Optional[datetime.date]], int]" = OrderedDict()
+        self._generation = 0
+        self._floor = 0  # generations below this may have lost their record; treated as stale
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_sets = 0
+
+    def get(self, key: Key) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self) -> int:
+        """Take before reading the value of a miss; pass to set()."""
+        with self._lock:
+            return self._generation
+
+    def _is_stale(self, key: Key, generation: int) -> bool:
+        _, restaurant_id, date = key
+        return (
+            generation < self._floor
+            or self._invalidated.get((restaurant_id, None), -1) > generation
+            or (date is not None and self._invalidated.get((restaurant_id, date), -1) > generation)
+        )
+
+    def set(self, key: Key, value: Any, generation: Optional[int] = None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and self._is_stale(key, generation):
+                self.stale_sets += 1
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, restaurant_id: int, date: Optional[datetime.date] = None):
+        """
+        Drops the cached responses of a restaurant. With a date, only entries for
+        that date go; without one, every entry of the restaurant goes.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._generation += 1
+            self._invalidated[(restaurant_id, date)] = self._generation
+            self._invalidated.move_to_end((restaurant_id, date))
+            while len(self._invalidated) > self.max_entries:
+                _, dropped = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, dropped)
+            stale = [
+                key for key in self._entries
+                if key[1] == restaurant_id and (date is None or key[2] == date)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self) -> int:
+        with self._lock:
+            flushed = len(self._entries)
+            self._entries.clear()
+            self._generation += 1
+            self._floor = self._generation
+            self._invalidated.clear()
+            self.invalidations += flushed
+            return flushed
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_sets": self.stale_sets,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+availability_cache = ResponseCache(
+    enabled=settings.AVAILABILITY_CACHE_ENABLED,
+    max_entries=settings.AVAILABILITY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AVAILABILITY_CACHE_TTL_SECONDS,
+)
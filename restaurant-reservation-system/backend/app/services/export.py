@@ -0,0 +1,68 @@
+"""
+Streaming reservation export. Rows come from a server-side cursor in chunks
+of EXPORT_CHUNK_ROWS and are encoded one chunk at a time, so a worker holds
+at most one chunk in memory regardless of the size of the export.
+"""
+from typing import AsyncIterator
+import csv
+import io
+import json
+
+from app.db.session import db_session
+from app.models.reservation import Reservation
+
+EXPORT_CHUNK_ROWS = 2000
+
+EXPORT_COLUMNS = (
+    Reservation.id,
+    Reservation.restaurant_id,
+    Reservation.table_id,
+    Reservation.date,
+    Reservation.start_time,
+    Reservation.end_time,
+    Reservation.status,
+    Reservation.user_name,
+    Reservation.user_phone,
+    Reservation.user_email,
+    Reservation.preorder_note,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _plain(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def encode_csv(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def encode_ndjson(rows) -> str:
+    return "".join(
+        json.dumps({field: _plain(value) for field, value in zip(EXPORT_FIELDS, row)}) + "\n"
+        for row in rows
+    )
+
+
+async def stream_export(query, format: str) -> AsyncIterator[str]:
+    """
+    Yields the encoded export chunk by chunk. The generator owns its session
+    (on the read replica when one is configured) because it outlives the
+    request handler that returned the StreamingResponse.
+    """
+    if format == "csv":
+        yield encode_csv([], header=True)
+    async with db_session(read=True) as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        async for rows in result.partitions():
+            yield encode_csv(rows) if format == "csv" else encode_ndjson(rows)
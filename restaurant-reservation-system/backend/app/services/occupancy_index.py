@@ -0,0 +1,195 @@
+"""
+Optional in-process index of table occupancy, one sorted interval list per
+(table_id, date). Entries are loaded lazily from the database on a miss and
+kept current by the write paths in the API routers. Each worker process has
+its own index, so enable it only when every write for a table goes through
+this process (e.g. a single worker) or accept staleness until eviction.
+"""
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import datetime
+import threading
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.reservation import Reservation
+from app.models.table_block import TableBlock
+from app.services.block_rules import get_rule_intervals
+
+
+class Interval(NamedTuple):
+    start_time: datetime.time
+    end_time: datetime.time
+    kind: str  # "reservation", "block" or "rule" (recurring block)
+    ref_id: int
+    status: Optional[str]  # reservation status, None for blocks
+
+
+Key = Tuple[int, datetime.date]
+
+
+class OccupancyIndex:
+    def __init__(self, enabled: bool = False, max_entries: int = 20000):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Key, List[Interval]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ── Reads ────────────────────────────────────────────────────
+
+    def get_many(self, db: Session, table_ids: Iterable[int], date: datetime.date) -> Dict[int, List[Interval]]:
+        """Returns the intervals of each table on a date, loading all misses in two queries."""
+        table_ids = list(table_ids)
+        found: Dict[int, List[Interval]] = {}
+        with self._lock:
+            for table_id in table_ids:
+                key = (table_id, date)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[table_id] = list(self._entries[key])
+                    self.hits += 1
+            missing = [t for t in table_ids if t not in found]
+            self.misses += len(missing)
+            generation = self._generation
+        if missing:
+            loaded = self._load(db, missing, date)
+            with self._lock:
+                # A write landed while we were reading: serve the rows but do not cache them
+                if generation == self._generation:
+                    for table_id, intervals in loaded.items():
+                        self._entries[(table_id, date)] = intervals
+                    self._evict()
+            found.update({t: list(v) for t, v in loaded.items()})
+        return found
+
+    def get(self, db: Session, table_id: int, date: datetime.date) -> List[Interval]:
+        return self.get_many(db, [table_id], date)[table_id]
+
+    def has_overlap(
+        self,
+        db: Session,
+        table_id: int,
+        date: datetime.date,
+        start_time: datetime.time,
+        end_time: datetime.time,
+        exclude_reservation_id: int = None,
+    ) -> bool:
+        intervals = self.get(db, table_id, date)
+        # Only intervals starting before end_time can overlap
+        upper = bisect_left(intervals, (end_time,))
+        for interval in intervals[:upper]:
+            if interval.end_time <= start_time:
+                continue
+            if interval.kind == "reservation" and interval.ref_id == exclude_reservation_id:
+                continue
+            return True
+        return False
+
+    def _load(self, db: Session, table_ids: List[int], date: datetime.date) -> Dict[int, List[Interval]]:
+        loaded: Dict[int, List[Interval]] = {t: [] for t in table_ids}
+        reservations = db.query(
+            Reservation.id, Reservation.table_id, Reservation.start_time,
+            Reservation.end_time, Reservation.status,
+        ).filter(
+            Reservation.table_id.in_(table_ids),
+            Reservation.date == date,
+            Reservation.status != "cancelled",
+            Reservation.status != "declined",
+        )
+        for row in reservations:
+            loaded[row.table_id].append(
+                Interval(row.start_time, row.end_time, "reservation", row.id, row.status)
+            )
+        blocks = db.query(
+            TableBlock.id, TableBlock.table_id, TableBlock.start_time, TableBlock.end_time,
+        ).filter(
+            TableBlock.table_id.in_(table_ids),
+            TableBlock.date == date,
+        )
+        for row in blocks:
+            loaded[row.table_id].append(
+                Interval(row.start_time, row.end_time, "block", row.id, None)
+            )
+        for row in get_rule_intervals(db, table_ids, date):
+            loaded[row.table_id].append(
+                Interval(row.start_time, row.end_time, "rule", row.id, None)
+            )
+        for intervals in loaded.values():
+            intervals.sort()
+        return loaded
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ── Write hooks (call after commit) ──────────────────────────
+
+    def _upsert(self, key: Key, ref_id: int, kind: str, interval: Optional[Interval]):
+        with self._lock:
+            self._generation += 1
+            intervals = self._entries.get(key)
+            if intervals is None:
+                return
+            intervals[:] = [i for i in intervals if not (i.kind == kind and i.ref_id == ref_id)]
+            if interval is not None:
+                insort(intervals, interval)
+
+    def reservation_saved(self, reservation: Reservation):
+        if not self.enabled:
+            return
+        interval = None
+        if reservation.status not in ("cancelled", "declined"):
+            interval = Interval(
+                reservation.start_time, reservation.end_time,
+                "reservation", reservation.id, reservation.status,
+            )
+        self._upsert((reservation.table_id, reservation.date), reservation.id, "reservation", interval)
+
+    def block_saved(self, block: TableBlock):
+        if not self.enabled:
+            return
+        interval = Interval(block.start_time, block.end_time, "block", block.id, None)
+        self._upsert((block.table_id, block.date), block.id, "block", interval)
+
+    def invalidate(self, table_id: int, date: Optional[datetime.date] = None):
+        """Drops one (table, date) entry, or every date of a table when date is None."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._generation += 1
+            if date is not None:
+                self._entries.pop((table_id, date), None)
+            else:
+                for key in [k for k in self._entries if k[0] == table_id]:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+occupancy_index = OccupancyIndex(
+    enabled=settings.OCCUPANCY_INDEX_ENABLED,
+    max_entries=settings.OCCUPANCY_INDEX_MAX_ENTRIES,
+)
@@ -0,0 +1,96 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, exists
+from typing import List, Optional
+import datetime
+
+from app.models.reservation import Reservation
+from app.models.restaurant import Restaurant
+from app.models.table import Table
+from app.models.table_block import TableBlock
+from app.services.block_rules import rule_conflict
+
+
+def search_free_tables(
+    db: Session,
+    location_id: int,
+    date: datetime.date,
+    start_time: datetime.time,
+    end_time: datetime.time,
+    party_size: int,
+    zone: Optional[str] = None,
+    limit: int = 50,
+) -> List[tuple]:
+    """
+    Returns (Table, restaurant_name) pairs for every table in a location that
+    seats the party and is free for the whole time window, best capacity fit first.
+    Runs as a single query: overlapping reservations, blocks and block rules are excluded
+    with correlated NOT EXISTS probes on the (table_id, date) indexes.
+    """
+    reservation_conflict = exists().where(
+        and_(
+            Reservation.table_id == Table.id,
+            Reservation.date == date,
+            Reservation.status != "cancelled",
+            Reservation.status != "declined",
+            Reservation.start_time < end_time,
+            Reservation.end_time > start_time,
+        )
+    )
+    block_conflict = exists().where(
+        and_(
+            TableBlock.table_id == Table.id,
+            TableBlock.date == date,
+            TableBlock.start_time < end_time,
+            TableBlock.end_time > start_time,
+        )
+    )
+    # Tables the admin marked occupied/blocked for this date cannot be booked
+    manual_open = or_(
+        Table.manual_status.is_(None),
+        Table.manual_status_date.is_(None),
+        Table.manual_status_date != str(date),
+        Table.manual_status.notin_(["occupied", "blocked"]),
+    )
+
+    query = (
+        db.query(Table, Restaurant.name)
+        .join(Restaurant, Restaurant.id == Table.restaurant_id)
+        .filter(
+            Restaurant.location_id == location_id,
+            Table.archived_at.is_(None),
+            Table.capacity >= party_size,
+            manual_open,
+            ~reservation_conflict,
+            ~block_conflict,
+            ~rule_conflict(Table.id, date, start_time, end_time),
+        )
+    )
+    if zone:
+        query = query.filter(Table.zone == zone)
+
+    return (
+        query.order_by(
+            Table.capacity - party_size,
+            Restaurant.name,
+            Table.name,
+            Table.id,
+        )
+        .limit(limit)
+        .all()
+    )
+
+
+async def search_free_tables_async(
+    db: AsyncSession,
+    location_id: int,
+    date: datetime.date,
+    start_time: datetime.time,
+    end_time: datetime.time,
+    party_size: int,
+    zone: Optional[str] = None,
+    limit: int = 50,
+) -> List[tuple]:
+    return await db.run_sync(
+        search_free_tables, location_id, date, start_time, end_time, party_size, zone, limit
+    )
@@ -0,0 +1,95 @@
+"""
+Per-(table_id, date) write lock for the booking and blocking paths.
+
+On PostgreSQL this is a transaction-scoped advisory lock keyed by
+(table_id, date ordinal), released automatically on commit or rollback.
+Elsewhere an in-process lock per key is held for the duration of the
+`async with` block, so the block must include the commit. Requests for
+different tables or dates use different keys and never wait on each other.
+Waiting never blocks the event loop: acquisition is non-blocking and the
+backoff between attempts is an asyncio sleep.
+"""
+from contextlib import asynccontextmanager
+from typing import Dict, Tuple
+import asyncio
+import datetime
+import random
+import threading
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+Key = Tuple[int, datetime.date]
+
+
+class TableBusy(Exception):
+    """The lock for a table and date could not be taken within the retry budget."""
+
+
+class _KeyedLocks:
+    """Reference-counted locks so keys nobody holds are not kept around."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks: Dict[Key, list] = {}  # key -> [lock, refcount]
+
+    def checkout(self, key: Key) -> threading.Lock:
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+            return entry[0]
+
+    def checkin(self, key: Key):
+        with self._guard:
+            entry = self._locks[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+
+_local_locks = _KeyedLocks()
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, settings.TABLE_LOCK_BACKOFF_SECONDS * (2 ** attempt))
+
+
+@asynccontextmanager
+async def table_date_lock(db: AsyncSession, table_id: int, date: datetime.date):
+    """
+    Serializes writes for one table on one date. Retries a non-blocking acquire
+    up to TABLE_LOCK_ATTEMPTS times with jittered backoff, then raises TableBusy.
+    """
+    attempts = settings.TABLE_LOCK_ATTEMPTS
+
+    if db.get_bind().dialect.name == "postgresql":
+        statement = select(func.pg_try_advisory_xact_lock(table_id, date.toordinal()))
+        for attempt in range(attempts):
+            if (await db.execute(statement)).scalar():
+                break
+            if attempt + 1 < attempts:
+                await asyncio.sleep(_backoff(attempt))
+        else:
+            raise TableBusy()
+        yield
+        return
+
+    key = (table_id, date)
+    lock = _local_locks.checkout(key)
+    try:
+        for attempt in range(attempts):
+            if lock.acquire(blocking=False):
+                break
+            if attempt + 1 < attempts:
+                await asyncio.sleep(_backoff(attempt))
+        else:
+            raise TableBusy()
+        try:
+            yield
+        finally:
+            lock.release()
+    finally:
+        _local_locks.checkin(key)
@@ -0,0 +1,108 @@
+"""
+Admin login throughput with bcrypt on its dedicated pool.
+
+For each PASSWORD_HASH_WORKERS value, `--clients` admins log in over and
+over while a second group of clients reads public availability. The login
+rows show how many bcrypt checks per second the pool sustains; the
+availability rows show what a login burst costs everybody else.
+
+Usage (from backend/):
+
+    python -m benchmarks.admin_login --database-url sqlite:////tmp/bench.db
+    python -m benchmarks.admin_login --workers 1,2,4 --rounds 12 --clients 32
+"""
+import argparse
+import asyncio
+import datetime
+import time
+
+from benchmarks import common
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:////tmp/resres_bench.db")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated PASSWORD_HASH_WORKERS values")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost of the seeded admins")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent logins")
+    parser.add_argument("--logins", type=int, default=64, help="logins per run")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent availability readers during the logins")
+    return parser.parse_args()
+
+
+def seed_admins(restaurant_id: int, count: int, rounds: int) -> list:
+    from app.core import security
+    from app.db.session import SessionLocal
+    from app.models import AdminUser
+
+    password_hash = security.pwd_context.hash("bench-password", rounds=rounds)
+    db = SessionLocal()
+    try:
+        emails = [f"bench{i}@example.com" for i in range(count)]
+        db.add_all([
+            AdminUser(email=email, password_hash=password_hash, role="admin", restaurant_id=restaurant_id)
+            for email in emails
+        ])
+        db.commit()
+        return emails
+    finally:
+        db.close()
+
+
+async def run(args):
+    import httpx
+
+    from app.api import admin as admin_api
+    from app.core import security
+    from app.main import app
+
+    common.reset_database()
+    seed = common.seed_restaurant(20)
+    restaurant_id = seed["restaurant_id"]
+    emails = seed_admins(restaurant_id, args.clients, args.rounds)
+    date = str(datetime.date(2030, 1, 1))
+
+    print(f"{'workers':>7} {'kind':<13} {'reqs':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for workers in (int(n) for n in args.workers.split(",")):
+        verifier = security.PasswordVerifier(workers=workers, max_pending=args.clients)
+        security.password_verifier = admin_api.password_verifier = verifier
+        done = asyncio.Event()
+
+        async def login(client, n, i):
+            return await client.post("/admin/login", json={"email": emails[n], "password": "bench-password"})
+
+        async def read_while_logging_in():
+            latencies, statuses = [], {}
+            async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+                async def reader():
+                    while not done.is_set():
+                        began = time.perf_counter()
+                        response = await client.get(f"/restaurants/{restaurant_id}/availability", params={"date": date})
+                        latencies.append(time.perf_counter() - began)
+                        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                began = time.perf_counter()
+                await asyncio.gather(*(reader() for _ in range(args.readers)))
+                return common.summarize(latencies, statuses, time.perf_counter() - began)
+
+        readers = asyncio.create_task(read_while_logging_in())
+        logins = await common.drive(app, login, args.clients, args.logins)
+        done.set()
+        reads = await readers
+
+        for kind, r in (("login", logins), ("availability", reads)):
+            print(
+                f"{workers:>7} {kind:<13} {r['requests']:>6} {r['throughput']:>9.1f} "
+                f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}  {r['statuses']}"
+            )
+        # The first run re-hashes every admin to BCRYPT_ROUNDS; later runs see the current cost
+        print(f"{'':>7} rehashed {verifier.stats()['rehashed']}")
+
+
+def main():
+    args = parse_args()
+    common.configure(args.database_url)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
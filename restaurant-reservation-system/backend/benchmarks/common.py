@@ -0,0 +1,108 @@
+"""
+Shared helpers for the benchmark scripts: scratch-database setup and an
+in-process load driver that sends requests to the ASGI app from a single
+event loop, the same way uvicorn serves them.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+def configure(database_url: str):
+    """Points the app at the benchmark database. Must run before importing app.*"""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("AVAILABILITY_CACHE_ENABLED", "false")
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def reset_database():
+    """
+    Empties the scratch database. A schema managed by Alembic is kept (so the
+    Postgres overlap constraints stay part of the measurement); anything else
+    is dropped and recreated from the models.
+    """
+    from sqlalchemy import inspect
+
+    from app.db.session import Base, engine
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+    if "alembic_version" in inspect(engine).get_table_names():
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+    else:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+
+def seed_restaurant(table_count: int) -> dict:
+    """Creates one location and restaurant with `table_count` tables."""
+    from app.db.session import SessionLocal
+    from app.models import Location, Restaurant, Table
+
+    db = SessionLocal()
+    try:
+        location = Location(name="Bench")
+        db.add(location)
+        db.flush()
+        restaurant = Restaurant(name="Bench Restaurant", location_id=location.id)
+        db.add(restaurant)
+        db.flush()
+        tables = [Table(restaurant_id=restaurant.id, name=f"B{i}", capacity=4) for i in range(table_count)]
+        db.add_all(tables)
+        db.commit()
+        return {
+            "location_id": location.id,
+            "restaurant_id": restaurant.id,
+            "table_ids": [t.id for t in tables],
+        }
+    finally:
+        db.close()
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, statuses, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "statuses": statuses,
+    }
+
+
+async def drive(app, send, concurrency: int, total: int) -> dict:
+    """
+    Runs exactly `total` requests through `concurrency` concurrent workers (the
+    remainder goes one each to the first workers). `send` is an async callable
+    (client, worker, i) -> response for the i-th request of a worker.
+    """
+    import httpx
+
+    latencies = []
+    statuses = {}
+    per_worker, remainder = divmod(total, concurrency)
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        async def worker(n):
+            for i in range(per_worker + (n < remainder)):
+                began = time.perf_counter()
+                response = await send(client, n, i)
+                latencies.append(time.perf_counter() - began)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        began = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - began
+
+    return summarize(latencies, statuses, elapsed)
@@ -0,0 +1,141 @@
+"""
+Startup budget check: how long a worker takes from launch to its first
+served request, and whether startup touches the database at all.
+
+Schema creation and seeding live in `python -m app.db.init_db`; a worker
+must start without using a single connection. The script exits non-zero
+when a connection is used during startup or any cold start exceeds
+--budget-ms, so it can gate a deploy. tests/test_startup.py runs the same
+assertions (assert_no_startup_connections, assert_cold_start_within) with
+the test suite.
+
+Usage (from backend/):
+
+    python -m benchmarks.startup --database-url sqlite:////tmp/bench.db
+    python -m benchmarks.startup --runs 5 --budget-ms 3000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks import common
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:////tmp/resres_bench.db")
+    parser.add_argument("--runs", type=int, default=3, help="cold starts of a uvicorn worker")
+    parser.add_argument("--budget-ms", type=float, default=5000, help="max launch-to-first-response time")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def cold_start(timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn until GET / answers."""
+    port = free_port()
+    began = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=common.BACKEND_DIR,
+        env=os.environ.copy(),
+    )
+    try:
+        while time.perf_counter() - began < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1):
+                    return time.perf_counter() - began
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with {process.returncode}")
+                time.sleep(0.01)
+        raise RuntimeError(f"no response within {timeout:.0f}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def startup_connections() -> int:
+    """
+    Connections checked out (new or pooled) while importing the app and
+    running its startup handlers.
+    """
+    from sqlalchemy import event
+
+    from app.db import session
+
+    used = []
+    engines = [session.engine, session.async_engine.sync_engine]
+    engines += [e.sync_engine if hasattr(e, "sync_engine") else e
+                for e in (session.read_engine, session.read_async_engine) if e is not None]
+
+    def count(*args):
+        used.append(1)
+
+    for engine in engines:
+        event.listen(engine, "checkout", count)
+    try:
+        from app.main import app
+
+        await app.router.startup()
+        await app.router.shutdown()
+    finally:
+        for engine in engines:
+            event.remove(engine, "checkout", count)
+    return len(used)
+
+
+def assert_no_startup_connections() -> int:
+    """Fails with AssertionError when starting the app uses a database connection."""
+    connections = asyncio.run(startup_connections())
+    if connections:
+        raise AssertionError(f"startup used {connections} database connection(s), expected none")
+    return connections
+
+
+def assert_cold_start_within(budget_ms: float, runs: int = 3) -> list:
+    """
+    Fails with AssertionError when any of `runs` cold starts of a uvicorn
+    worker takes longer than `budget_ms` to answer its first request.
+    Returns the timings in milliseconds.
+    """
+    timings = [cold_start() * 1000 for _ in range(runs)]
+    if max(timings) > budget_ms:
+        raise AssertionError(
+            f"cold start {max(timings):.0f} ms over the {budget_ms:.0f} ms budget "
+            f"(runs: {', '.join(f'{t:.0f}' for t in timings)})"
+        )
+    return timings
+
+
+def main():
+    args = parse_args()
+    common.configure(args.database_url)
+
+    failures = 0
+    try:
+        assert_no_startup_connections()
+        print("connections used during startup: 0")
+    except AssertionError as error:
+        failures += 1
+        print(f"FAIL {error}")
+    try:
+        timings = assert_cold_start_within(args.budget_ms, args.runs)
+        print(f"cold start ms: min {min(timings):.0f}  max {max(timings):.0f}  budget {args.budget_ms:.0f}")
+    except AssertionError as error:
+        failures += 1
+        print(f"FAIL {error}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+The app reads its settings when imported, so the databases are chosen here,
+before any test imports it: two SQLite files stand in for the primary and a
+read replica. The replica is never written by the app; tests that need it to
+lag simply leave it behind.
+
+Run from backend/ with `python -m pytest`.
+"""
+import datetime
+import os
+import tempfile
+
+import pytest
+from sqlalchemy.orm import Session
+
+_DB_DIR = tempfile.mkdtemp(prefix="resres-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/primary.db"
+os.environ["READ_DATABASE_URL"] = f"sqlite:///{_DB_DIR}/replica.db"
+os.environ["METRICS_DIR"] = ""
+os.environ["PROFILING_ENABLED"] = "false"
+
+DAY = datetime.date(2030, 1, 7)
+
+
+@pytest.fixture
+def databases():
+    """Empty schema on both databases; yields (primary engine, replica engine)."""
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+    from app.db.session import Base, engine, read_after_write, read_engine
+    from app.services.cache import availability_cache
+
+    for bind in (engine, read_engine):
+        Base.metadata.drop_all(bind=bind)
+        Base.metadata.create_all(bind=bind)
+    availability_cache.clear()
+    read_after_write._written.clear()
+    yield engine, read_engine
+    availability_cache.clear()
+
+
+@pytest.fixture
+def restaurant(databases):
+    """The same restaurant with three tables on both databases, as after replication."""
+    from app.models import Location, Restaurant, Table
+
+    for bind in databases:
+        with Session(bind) as session:
+            session.add_all([
+                Location(id=1, name="Sahil"),
+                Restaurant(id=1, name="Nargiz", location_id=1),
+                *[Table(id=n, restaurant_id=1, name=f"T{n}", capacity=4) for n in (1, 2, 3)],
+            ])
+            session.commit()
+    return {"restaurant_id": 1, "table_ids": [1, 2, 3]}
+
+
+@pytest.fixture
+def client(databases):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def admin_headers(restaurant_id=None):
+    """Authorization for a super admin, or for the admin of `restaurant_id`."""
+    from app.core.security import create_access_token
+
+    token = create_access_token({"sub": "admin@example.com", "role": "admin", "restaurant_id": restaurant_id})
+    return {"Authorization": f"Bearer {token}"}
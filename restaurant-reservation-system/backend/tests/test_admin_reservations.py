@@ -0,0 +1,67 @@
+"""The admin reservation list: unpaged by default, keyset pages on request."""
+import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Reservation
+from tests.conftest import DAY, admin_headers
+
+
+@pytest.fixture
+def reservations(databases, restaurant):
+    """Seven reservations over three days, two of them sharing a start time; newest first."""
+    slots = [(0, 12), (0, 19), (0, 19), (1, 12), (1, 20), (2, 18), (2, 21)]
+    with Session(databases[0]) as session:
+        rows = [
+            Reservation(
+                table_id=1 + n % 3, restaurant_id=1, date=DAY + datetime.timedelta(days=day),
+                start_time=datetime.time(hour), end_time=datetime.time(hour, 45), user_name=f"Guest {n}",
+                status="confirmed",
+            )
+            for n, (day, hour) in enumerate(slots)
+        ]
+        session.add_all(rows)
+        session.commit()
+        ordered = sorted(rows, key=lambda r: (r.date, r.start_time, r.id), reverse=True)
+        return [r.id for r in ordered]
+
+
+def list_reservations(client, **params):
+    response = client.get("/admin/reservations", headers=admin_headers(), params=params)
+    assert response.status_code == 200, response.text
+    return [r["id"] for r in response.json()], response.headers.get("X-Next-Cursor")
+
+
+def test_without_limit_or_cursor_every_row_comes_back(reservations, client):
+    assert list_reservations(client) == (reservations, None)
+
+
+def test_cursor_pages_cover_every_row_once_in_order(reservations, client):
+    seen = []
+    ids, cursor = list_reservations(client, limit=3)
+    while True:
+        assert len(ids) <= 3
+        seen += ids
+        if cursor is None:
+            break
+        ids, cursor = list_reservations(client, limit=3, cursor=cursor)
+
+    assert seen == reservations
+    # Filters apply to every page
+    first, cursor = list_reservations(client, limit=1, date_from=str(DAY + datetime.timedelta(days=1)))
+    second, _ = list_reservations(client, limit=10, cursor=cursor, date_from=str(DAY + datetime.timedelta(days=1)))
+    assert first + second == reservations[:4]
+
+
+def test_cursor_without_limit_pages_by_the_default(reservations, client):
+    _, cursor = list_reservations(client, limit=2)
+    assert list_reservations(client, cursor=cursor) == (reservations[2:], None)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "bm90fGF8Y3Vyc29y", "MjAzMC0wMS0wN3wxMjowMDowMHx4"])
+def test_invalid_cursor_is_a_400(reservations, client, cursor):
+    response = client.get("/admin/reservations", headers=admin_headers(), params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
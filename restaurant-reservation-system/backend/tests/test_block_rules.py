@@ -0,0 +1,77 @@
+"""Recurring block rules: which dates they cover, and what they refuse."""
+import datetime
+
+from tests.conftest import DAY, admin_headers
+
+MONDAY = DAY
+WEEK = datetime.timedelta(days=7)
+
+
+def book(client, table_id, date, start="12:00", end="13:00"):
+    return client.post("/reservations", json={
+        "table_id": table_id, "restaurant_id": 1, "date": str(date), "start_time": start, "end_time": end,
+        "user_name": "Guest", "user_phone": "000", "user_email": "guest@example.com",
+    })
+
+
+def add_rule(client, **fields):
+    response = client.post("/admin/table-block-rules", headers=admin_headers(1), json={
+        "table_id": 1, "restaurant_id": 1, "start_time": "11:00", "end_time": "15:00", **fields,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def status(client, date, table_id=1):
+    response = client.get("/restaurants/1/availability", params={"date": str(date)})
+    return {t["id"]: t["status"] for t in response.json()}[table_id]
+
+
+def test_weekly_rule_blocks_its_weekday_until_an_exception(restaurant, client):
+    assert MONDAY.weekday() == 0
+    rule = add_rule(client, frequency="weekly", weekday=0, start_date=str(MONDAY))
+
+    assert book(client, 1, MONDAY + WEEK).status_code == 409
+    assert status(client, MONDAY + WEEK) == "blocked"
+    # Other weekdays, hours and tables are untouched
+    assert book(client, 1, MONDAY + datetime.timedelta(days=1)).status_code == 201
+    assert book(client, 1, MONDAY + WEEK, start="15:00", end="16:00").status_code == 201
+    assert book(client, 2, MONDAY + WEEK).status_code == 201
+
+    response = client.post(
+        f"/admin/table-block-rules/{rule['id']}/exceptions", headers=admin_headers(1),
+        json={"date": str(MONDAY + 2 * WEEK)},
+    )
+    assert response.status_code == 200
+    assert status(client, MONDAY + 2 * WEEK) == "available"
+    assert book(client, 1, MONDAY + 2 * WEEK).status_code == 201
+    assert book(client, 1, MONDAY + 3 * WEEK).status_code == 409
+
+
+def test_daily_rule_stops_after_its_end_date(restaurant, client):
+    last = MONDAY + datetime.timedelta(days=3)
+    add_rule(client, frequency="daily", start_date=str(MONDAY), end_date=str(last))
+
+    assert book(client, 1, MONDAY - datetime.timedelta(days=1)).status_code == 201
+    assert book(client, 1, MONDAY).status_code == 409
+    assert book(client, 1, last).status_code == 409
+    assert status(client, last) == "blocked"
+    assert book(client, 1, last + datetime.timedelta(days=1)).status_code == 201
+    assert status(client, last + datetime.timedelta(days=1)) != "blocked"
+
+    response = client.get("/restaurants/1/availability/calendar", params={
+        "start_date": str(last - datetime.timedelta(days=1)), "end_date": str(last + datetime.timedelta(days=1)),
+    })
+    assert [day["blocked"] for day in response.json()] == [1, 1, 0]
+
+
+def test_rule_over_an_active_reservation_is_refused(restaurant, client):
+    assert book(client, 1, MONDAY + WEEK).status_code == 201
+
+    response = client.post("/admin/table-block-rules", headers=admin_headers(1), json={
+        "table_id": 1, "restaurant_id": 1, "frequency": "weekly", "weekday": 0,
+        "start_date": str(MONDAY), "start_time": "11:00", "end_time": "15:00",
+    })
+    assert response.status_code == 409
+    # The same rule skipping that Monday is fine
+    add_rule(client, frequency="weekly", weekday=0, start_date=str(MONDAY), exceptions=[str(MONDAY + WEEK)])
@@ -0,0 +1,109 @@
+"""
+Overlapping reservations and blocks are refused with 409. The app tests run
+on SQLite, where booking checks for overlaps before inserting; set
+TEST_POSTGRES_URL to an empty PostgreSQL database to also run the path where
+the exclusion constraints of migration 0002 reject them.
+"""
+import datetime
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models import Location, Reservation, Restaurant, Table, TableBlock
+from app.services.booking import BookingConflict, has_overlap_constraints, insert_without_overlap
+from tests.conftest import DAY, admin_headers
+
+
+def book(client, table_id, start, end):
+    return client.post("/reservations", json={
+        "table_id": table_id, "restaurant_id": 1, "date": str(DAY), "start_time": start, "end_time": end,
+        "user_name": "Guest", "user_phone": "000", "user_email": "guest@example.com",
+    })
+
+
+def block(client, table_id, start, end):
+    return client.post("/admin/table-blocks", headers=admin_headers(1), json={
+        "table_id": table_id, "restaurant_id": 1, "date": str(DAY), "start_time": start, "end_time": end,
+    })
+
+
+def test_overlapping_booking_is_refused_with_suggestions(restaurant, client):
+    assert book(client, 1, "19:00", "21:00").status_code == 201
+
+    response = book(client, 1, "20:00", "21:00")
+
+    assert response.status_code == 409
+    body = response.json()
+    assert "already reserved or blocked" in body["detail"]
+    assert body["suggestions"]
+    for slot in body["suggestions"]:
+        assert (slot["date"], slot["end_time"] > slot["start_time"]) == (str(DAY), True)
+        if slot["table_id"] == 1:
+            assert slot["end_time"] <= "19:00:00" or slot["start_time"] >= "21:00:00"
+    # Back to back is not an overlap
+    assert book(client, 1, "21:00", "22:00").status_code == 201
+
+
+def test_booking_over_a_block_is_refused(restaurant, client):
+    assert block(client, 2, "12:00", "14:00").status_code == 201
+
+    assert book(client, 2, "13:00", "15:00").status_code == 409
+    assert book(client, 3, "13:00", "15:00").status_code == 201
+
+
+def test_block_over_a_reservation_is_refused(restaurant, client):
+    assert book(client, 1, "19:00", "21:00").status_code == 201
+
+    response = block(client, 1, "18:00", "19:30")
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Time conflict with an existing reservation or block"
+    assert block(client, 1, "17:00", "19:00").status_code == 201
+
+
+@pytest.fixture
+def postgres(monkeypatch):
+    """TEST_POSTGRES_URL migrated to head (overlap constraints included); yields its engine."""
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    from alembic import command
+    from alembic.config import Config
+
+    from app.core.config import settings
+    from app.db.init_db import BACKEND_DIR
+
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.downgrade(config, "base")
+    command.upgrade(config, "head")
+    bind = create_engine(url)
+    yield bind
+    bind.dispose()
+
+
+def test_database_constraints_reject_overlaps(postgres):
+    def slot(model, start, end, **extra):
+        return model(
+            table_id=1, restaurant_id=1, date=DAY, start_time=datetime.time(start),
+            end_time=datetime.time(end), **extra,
+        )
+
+    with Session(postgres) as session:
+        session.add_all([Location(id=1, name="Sahil"), Restaurant(id=1, name="Nargiz", location_id=1)])
+        session.flush()
+        session.add(Table(id=1, restaurant_id=1, name="T1", capacity=4))
+        session.flush()
+        session.add(slot(Reservation, 19, 21, user_name="Guest", status="confirmed"))
+        session.commit()
+        assert has_overlap_constraints(session)
+
+        with pytest.raises(BookingConflict):
+            insert_without_overlap(session, slot(Reservation, 20, 22, user_name="Guest", status="pending"))
+        with pytest.raises(BookingConflict):
+            insert_without_overlap(session, slot(TableBlock, 18, 20))
+        insert_without_overlap(session, slot(Reservation, 21, 22, user_name="Guest", status="pending"))
+        session.commit()
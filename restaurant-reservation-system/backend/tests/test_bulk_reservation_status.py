@@ -0,0 +1,86 @@
+"""Bulk reservation status: per-id results, restaurant scope and reactivation conflicts."""
+import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Reservation, Restaurant, Table, TableBlock
+from tests.conftest import DAY, admin_headers
+
+
+def reservation(id, table_id, status, start, end, restaurant_id=1):
+    return Reservation(
+        id=id, table_id=table_id, restaurant_id=restaurant_id, date=DAY, start_time=datetime.time(*start),
+        end_time=datetime.time(*end), user_name="Guest", status=status,
+    )
+
+
+@pytest.fixture
+def bookings(databases, restaurant):
+    with Session(databases[0]) as session:
+        session.add_all([Restaurant(id=2, name="Dalga", location_id=1), Table(id=4, restaurant_id=2, name="D1")])
+        session.flush()
+        session.add_all([
+            reservation(1, 1, "pending", (19,), (21,)),
+            reservation(2, 1, "cancelled", (20,), (22,)),  # overlaps 1
+            reservation(3, 2, "declined", (12,), (14,)),
+            reservation(4, 2, "cancelled", (13,), (15,)),  # overlaps 3
+            reservation(5, 3, "cancelled", (12,), (13,)),
+            reservation(6, 4, "pending", (19,), (20,), restaurant_id=2),
+        ])
+        session.add(TableBlock(
+            table_id=3, restaurant_id=1, date=DAY, start_time=datetime.time(12, 30), end_time=datetime.time(14),
+        ))
+        session.commit()
+
+
+def bulk(client, ids, status, restaurant_id=None):
+    response = client.post(
+        "/admin/reservations/bulk-status", headers=admin_headers(restaurant_id), json={"ids": ids, "status": status},
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return body["updated"], {item["id"]: item["detail"] if not item["ok"] else "ok" for item in body["results"]}
+
+
+def statuses(databases):
+    with Session(databases[0]) as session:
+        return {r.id: r.status for r in session.scalars(select(Reservation))}
+
+
+def test_restaurant_admin_gets_a_result_per_id(bookings, databases, client):
+    updated, results = bulk(client, [1, 6, 99, 1], "cancelled", restaurant_id=1)
+
+    assert updated == 1
+    assert results == {
+        1: "ok",
+        6: "You can only manage your own restaurant",
+        99: "Reservation not found",
+    }
+    assert statuses(databases)[1] == "cancelled"
+    assert statuses(databases)[6] == "pending"
+
+
+def test_super_admin_reaches_every_restaurant(bookings, databases, client):
+    updated, results = bulk(client, [1, 6], "declined")
+
+    assert updated == 2
+    assert results == {1: "ok", 6: "ok"}
+    assert {statuses(databases)[n] for n in (1, 6)} == {"declined"}
+
+
+def test_reactivating_into_an_overlap_is_refused_per_id(bookings, databases, client):
+    updated, results = bulk(client, [2, 3, 4, 5], "confirmed", restaurant_id=1)
+
+    conflict = "Time conflict with an existing reservation or block"
+    assert results == {
+        2: conflict,  # overlaps the pending reservation 1
+        3: "ok",
+        4: conflict,  # overlaps 3, confirmed again earlier in the same batch
+        5: conflict,  # overlaps a block
+    }
+    assert updated == 1
+    assert statuses(databases) == {
+        1: "pending", 2: "cancelled", 3: "confirmed", 4: "cancelled", 5: "cancelled", 6: "pending",
+    }
@@ -0,0 +1,104 @@
+"""Floor-plan saves: optimistic version check, restaurant scope, one transaction."""
+import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Location, Reservation, Restaurant, Table, TableBlock
+from tests.conftest import DAY, admin_headers
+
+PAST = datetime.date(2020, 3, 2)
+
+
+def save(client, body, restaurant_id=1, headers=None):
+    return client.put(
+        f"/admin/restaurants/{restaurant_id}/floor-plan",
+        headers=headers or admin_headers(restaurant_id),
+        json={"layout_version": 1, **body},
+    )
+
+
+def add(databases, *rows):
+    with Session(databases[0]) as session:
+        session.add_all(rows)
+        session.commit()
+
+
+def reservation(table_id, date, status="confirmed"):
+    return Reservation(
+        table_id=table_id, restaurant_id=1, date=date, start_time=datetime.time(19),
+        end_time=datetime.time(20), user_name="Guest", status=status,
+    )
+
+
+def tables(databases):
+    with Session(databases[0]) as session:
+        return {t.id: (t.name, t.position_x, t.archived_at is not None) for t in session.scalars(select(Table))}
+
+
+def test_update_create_and_delete_in_one_save(databases, restaurant, client):
+    response = save(client, {
+        "floor_shape": "L",
+        "create": [{"name": "T4", "capacity": 6}],
+        "update": [{"id": 1, "position_x": 40}],
+        "delete": [3],
+    })
+
+    assert response.status_code == 200, response.text
+    plan = response.json()
+    assert plan["layout_version"] == 2
+    assert plan["floor_shape"] == "L"
+    assert sorted(t["name"] for t in plan["tables"]) == ["T1", "T2", "T4"]
+    assert sorted(tables(databases).values()) == [("T1", 40, False), ("T2", 0, False), ("T4", 0, False)]
+
+
+def test_stale_layout_version_writes_nothing(databases, restaurant, client):
+    assert save(client, {"update": [{"id": 1, "position_x": 40}]}).status_code == 200
+
+    response = save(client, {"create": [{"name": "T4"}], "update": [{"id": 2, "position_x": 40}], "delete": [3]})
+
+    assert response.status_code == 409
+    assert "now version 2" in response.json()["detail"]
+    assert tables(databases) == {1: ("T1", 40, False), 2: ("T2", 0, False), 3: ("T3", 0, False)}
+
+
+def test_failed_save_rolls_back_everything(databases, restaurant, client):
+    add(databases, reservation(3, DAY))
+
+    response = save(client, {"create": [{"name": "T4"}], "update": [{"id": 1, "position_x": 40}], "delete": [3]})
+
+    assert response.status_code == 409
+    assert "table 3: 1" in response.json()["detail"]
+    assert tables(databases) == {1: ("T1", 0, False), 2: ("T2", 0, False), 3: ("T3", 0, False)}
+    with Session(databases[0]) as session:
+        assert session.get(Restaurant, 1).layout_version == 1
+
+
+def test_other_restaurants_are_out_of_reach(databases, restaurant, client):
+    add(databases, Restaurant(id=2, name="Dalga", location_id=1), Table(id=4, restaurant_id=2, name="D1"))
+
+    assert save(client, {"delete": [1]}, headers=admin_headers(2)).status_code == 403
+    # A restaurant's own plan cannot touch another restaurant's tables
+    response = save(client, {"update": [{"id": 4, "position_x": 40}]})
+    assert response.status_code == 404
+    assert 1 in tables(databases) and tables(databases)[4] == ("D1", 0, False)
+
+
+def test_deleting_a_table_keeps_its_reservation_history(databases, restaurant, client):
+    add(
+        databases,
+        reservation(2, PAST), reservation(2, PAST, status="cancelled"),
+        TableBlock(table_id=2, restaurant_id=1, date=DAY, start_time=datetime.time(12), end_time=datetime.time(13)),
+    )
+
+    response = save(client, {"delete": [2, 3]})
+
+    assert response.status_code == 200, response.text
+    assert [t["id"] for t in response.json()["tables"]] == [1]
+    # T2 has history, so it is archived rather than deleted; T3 had none
+    assert tables(databases) == {1: ("T1", 0, False), 2: ("T2", 0, True)}
+    with Session(databases[0]) as session:
+        assert len(session.scalars(select(Reservation).where(Reservation.table_id == 2)).all()) == 2
+        assert session.scalars(select(TableBlock)).all() == []
+    assert [t["id"] for t in client.get("/restaurants/1/tables").json()] == [1]
+    assert save(client, {"layout_version": 2, "update": [{"id": 2, "position_x": 1}]}).status_code == 404
@@ -0,0 +1,82 @@
+"""
+Query budgets: the number of SQL statements each endpoint may run.
+
+A budget that does not depend on the data size is what keeps an N+1 from
+coming back, so the restaurant here has more tables, reservations and blocks
+than any budget; raise one only together with the change that needs it.
+"""
+import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.query_stats import assert_max_queries
+from tests.conftest import admin_headers
+
+ADMIN_EMAIL = "budget@example.com"
+ADMIN_PASSWORD = "budget-password"
+TABLES = 12
+TODAY = datetime.date.today()
+FREE_DAY = TODAY + datetime.timedelta(days=400)
+WEEK = {"start_date": str(TODAY), "end_date": str(TODAY + datetime.timedelta(days=6))}
+
+# (label, limit, method, path, request kwargs); limits as measured on SQLite and PostgreSQL
+BUDGETS = [
+    ("GET /locations", 1, "get", "/locations", {}),
+    ("GET /restaurants", 1, "get", "/restaurants", {}),
+    ("GET /restaurants/{id}", 1, "get", "/restaurants/1", {}),
+    ("GET /restaurants/{id}/tables", 2, "get", "/restaurants/1/tables", {}),
+    ("GET availability", 5, "get", "/restaurants/1/availability", {"params": {"date": str(TODAY)}}),
+    ("GET availability/calendar", 5, "get", "/restaurants/1/availability/calendar", {"params": WEEK}),
+    ("POST /reservations", 5, "post", "/reservations", {"json": {
+        "table_id": 1, "restaurant_id": 1, "date": str(FREE_DAY), "start_time": "12:00", "end_time": "13:00",
+        "user_name": "Budget", "user_phone": "000", "user_email": "budget@example.com",
+    }}),
+    # One more when the stored hash is re-hashed to BCRYPT_ROUNDS
+    ("POST /admin/login", 2, "post", "/admin/login", {"json": {"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}}),
+    ("GET /admin/reservations", 1, "get", "/admin/reservations", {
+        "headers": admin_headers(1), "params": {"date_from": str(TODAY - datetime.timedelta(days=7)), "limit": 100},
+    }),
+    ("PATCH /admin/tables/{id}/status", 3, "patch", "/admin/tables/1/status", {
+        "headers": admin_headers(1), "json": {"status": "occupied", "date": str(TODAY)},
+    }),
+]
+
+
+@pytest.fixture
+def busy_restaurant(databases):
+    """A restaurant with a fortnight of reservations and blocks around today, on both databases."""
+    from app.core.security import get_password_hash
+    from app.models import AdminUser, Location, Reservation, Restaurant, Table, TableBlock
+
+    password_hash = get_password_hash(ADMIN_PASSWORD)
+    for bind in databases:
+        with Session(bind) as session:
+            session.add_all([
+                Location(id=1, name="Sahil"),
+                Restaurant(id=1, name="Nargiz", location_id=1),
+                *[Table(id=n, restaurant_id=1, name=f"T{n}", capacity=2 + n % 4) for n in range(1, TABLES + 1)],
+                AdminUser(email=ADMIN_EMAIL, password_hash=password_hash, role="admin", restaurant_id=1),
+            ])
+            for offset in range(-7, 7):
+                day = TODAY + datetime.timedelta(days=offset)
+                for n in range(1, TABLES + 1):
+                    for hour, status in ((12, "confirmed"), (19, "pending" if n % 3 else "cancelled")):
+                        session.add(Reservation(
+                            table_id=n, restaurant_id=1, date=day, start_time=datetime.time(hour),
+                            end_time=datetime.time(hour + 2), user_name="Guest", status=status,
+                        ))
+                    if n % 4 == 0:
+                        session.add(TableBlock(
+                            table_id=n, restaurant_id=1, date=day,
+                            start_time=datetime.time(15), end_time=datetime.time(16),
+                        ))
+            session.commit()
+
+
+@pytest.mark.parametrize("label, limit, method, path, kwargs", BUDGETS, ids=[budget[0] for budget in BUDGETS])
+def test_endpoint_stays_within_its_query_budget(busy_restaurant, client, label, limit, method, path, kwargs):
+    with assert_max_queries(limit, label):
+        response = getattr(client, method)(path, **kwargs)
+
+    assert response.status_code < 400, response.text
@@ -0,0 +1,75 @@
+"""Public reads go to the replica, except where a guest must see a recent write."""
+import datetime
+import time
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.db.session import PRIMARY_UNTIL_COOKIE
+from app.models import Reservation, Restaurant
+from tests.conftest import DAY
+
+
+def rename_on_primary(databases, name):
+    """A write the replica has not caught up with yet."""
+    with Session(databases[0]) as session:
+        session.execute(update(Restaurant).where(Restaurant.id == 1).values(name=name))
+        session.commit()
+
+
+def book(client, table_id, start="19:00", end="20:00"):
+    return client.post("/reservations", json={
+        "table_id": table_id, "restaurant_id": 1, "date": str(DAY), "start_time": start, "end_time": end,
+        "user_name": "Guest", "user_phone": "000", "user_email": "guest@example.com",
+    })
+
+
+def statuses(client):
+    response = client.get("/restaurants/1/availability", params={"date": str(DAY)})
+    assert response.status_code == 200
+    return {table["id"]: table["status"] for table in response.json()}
+
+
+def test_public_reads_use_the_replica(databases, restaurant, client):
+    rename_on_primary(databases, "Renamed")
+
+    assert client.get("/restaurants/1").json()["name"] == "Nargiz"
+    assert [r["name"] for r in client.get("/restaurants").json()] == ["Nargiz"]
+
+
+def test_writer_reads_the_primary_after_booking(databases, restaurant, client):
+    rename_on_primary(databases, "Renamed")
+    response = book(client, 1)
+
+    assert response.status_code == 201
+    assert float(response.cookies[PRIMARY_UNTIL_COOKIE]) > time.time()
+    # The booking exists only on the primary; the guest sees it anyway
+    assert statuses(client)[1] != "available"
+    assert client.get("/restaurants").json()[0]["name"] == "Renamed"
+
+
+def test_other_guests_read_a_recently_written_restaurant_from_the_primary(databases, restaurant, client):
+    book(client, 1)
+    client.cookies.clear()
+
+    assert statuses(client)[1] != "available"
+    assert client.get("/restaurants/1/tables").status_code == 200
+    # Reads not about that restaurant stay on the replica
+    rename_on_primary(databases, "Renamed")
+    assert client.get("/restaurants").json()[0]["name"] == "Nargiz"
+
+
+def test_writer_cookie_bypasses_a_cache_another_worker_did_not_invalidate(databases, restaurant, client):
+    assert statuses(client)[2] == "available"  # cached, from the replica
+
+    # Booked through another worker: this worker's cache and write log know nothing of it
+    with Session(databases[0]) as session:
+        session.add(Reservation(
+            table_id=2, restaurant_id=1, date=DAY, start_time=datetime.time(19), end_time=datetime.time(20),
+            user_name="Guest", status="confirmed",
+        ))
+        session.commit()
+    assert statuses(client)[2] == "available"
+
+    client.cookies.set(PRIMARY_UNTIL_COOKIE, str(int(time.time()) + 5))
+    assert statuses(client)[2] != "available"
@@ -0,0 +1,15 @@
+"""Startup budget: a worker does no database work and answers its first request quickly."""
+import os
+
+from benchmarks.startup import assert_cold_start_within, assert_no_startup_connections
+
+# Generous for a cold interpreter on a loaded CI machine; STARTUP_BUDGET_MS tightens it
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 5000))
+
+
+def test_startup_uses_no_database_connection():
+    assert_no_startup_connections()
+
+
+def test_cold_start_within_budget():
+    assert_cold_start_within(STARTUP_BUDGET_MS, runs=2)
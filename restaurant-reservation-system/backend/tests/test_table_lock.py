@@ -0,0 +1,69 @@
+"""The per-(table, date) write lock, in its in-process form used off PostgreSQL."""
+import asyncio
+import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services import table_lock
+from app.services.table_lock import TableBusy, table_date_lock
+from tests.conftest import DAY
+
+
+@pytest.fixture
+def few_attempts(monkeypatch):
+    """Three attempts without backoff; returns the list of backoffs taken between them."""
+    backoffs = []
+
+    def backoff(attempt):
+        backoffs.append(attempt)
+        return 0
+
+    monkeypatch.setattr(settings, "TABLE_LOCK_ATTEMPTS", 3)
+    monkeypatch.setattr(table_lock, "_backoff", backoff)
+    return backoffs
+
+
+def test_second_holder_gives_up_after_the_attempt_budget(databases, few_attempts):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            async with table_date_lock(db, 1, DAY):
+                with pytest.raises(TableBusy):
+                    async with table_date_lock(db, 1, DAY):
+                        pass
+                assert len(few_attempts) == settings.TABLE_LOCK_ATTEMPTS - 1
+                # Another table or date is a different key
+                async with table_date_lock(db, 2, DAY):
+                    pass
+                async with table_date_lock(db, 1, DAY + datetime.timedelta(days=1)):
+                    pass
+                assert list(table_lock._local_locks._locks) == [(1, DAY)]
+            assert table_lock._local_locks._locks == {}
+            # Released: the key can be taken again at once
+            async with table_date_lock(db, 1, DAY):
+                pass
+        assert table_lock._local_locks._locks == {}
+
+    asyncio.run(scenario())
+
+
+def test_busy_table_answers_503(restaurant, client, few_attempts):
+    booking = {
+        "table_id": 1, "restaurant_id": 1, "date": str(DAY), "start_time": "19:00", "end_time": "20:00",
+        "user_name": "Guest", "user_phone": "000", "user_email": "guest@example.com",
+    }
+    key = (1, DAY)
+    lock = table_lock._local_locks.checkout(key)
+    lock.acquire()
+    try:
+        response = client.post("/reservations", json=booking)
+    finally:
+        lock.release()
+        table_lock._local_locks.checkin(key)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert len(few_attempts) == settings.TABLE_LOCK_ATTEMPTS - 1
+    assert table_lock._local_locks._locks == {}
+    assert client.post("/reservations", json=booking).status_code == 201
@@ -0,0 +1,130 @@
+"""The bulk table status call means, per table and date, what set_table_status does."""
+import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Reservation, Table, TableBlock
+from tests.conftest import DAY, admin_headers
+
+NEXT_DAY = DAY + datetime.timedelta(days=1)
+
+
+def add(databases, *rows):
+    with Session(databases[0]) as session:
+        session.add_all(rows)
+        session.commit()
+
+
+def reservation(table_id, date, status, start=19):
+    return Reservation(
+        table_id=table_id, restaurant_id=1, date=date, start_time=datetime.time(start),
+        end_time=datetime.time(start + 1), user_name="Guest", status=status,
+    )
+
+
+def admin_block(table_id, date):
+    return TableBlock(
+        table_id=table_id, restaurant_id=1, date=date, start_time=datetime.time(12),
+        end_time=datetime.time(13), reason="Window cleaning",
+    )
+
+
+def set_status(client, status, dates, table_ids=(1, 2, 3)):
+    response = client.patch("/admin/restaurants/1/tables/status", headers=admin_headers(1), json={
+        "status": status, "dates": [str(d) for d in dates], "table_ids": list(table_ids),
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def state(databases):
+    with Session(databases[0]) as session:
+        return {
+            "reservations": {
+                (r.table_id, r.date, r.start_time.hour): r.status for r in session.scalars(select(Reservation))
+            },
+            "blocks": sorted(
+                (b.table_id, b.date, b.start_time.hour, b.reason) for b in session.scalars(select(TableBlock))
+            ),
+            "manual": {t.id: (t.manual_status, t.manual_status_date) for t in session.scalars(select(Table))},
+        }
+
+
+def test_blocked_cancels_confirmed_only_and_keeps_existing_blocks(databases, restaurant, client):
+    add(
+        databases,
+        reservation(1, DAY, "confirmed"), reservation(2, DAY, "pending"),
+        reservation(3, NEXT_DAY, "confirmed"), reservation(1, NEXT_DAY, "pending", start=12),
+        admin_block(2, NEXT_DAY),
+    )
+
+    result = set_status(client, "blocked", [NEXT_DAY, DAY])
+
+    assert result["cancelled_reservations"] == 2
+    assert result["removed_blocks"] == 0
+    after = state(databases)
+    assert after["reservations"] == {
+        (1, DAY, 19): "cancelled", (2, DAY, 19): "pending",
+        (3, NEXT_DAY, 19): "cancelled", (1, NEXT_DAY, 12): "pending",
+    }
+    # The manual status covers the last date; the earlier one gets whole-day
+    # blocks only where nothing is left on the table that day
+    assert after["manual"] == {n: ("blocked", str(NEXT_DAY)) for n in (1, 2, 3)}
+    assert result["created_blocks"] == 2
+    assert after["blocks"] == [
+        (1, DAY, 0, None), (2, NEXT_DAY, 12, "Window cleaning"), (3, DAY, 0, None),
+    ]
+
+    response = client.get("/restaurants/1/availability", params={"date": str(NEXT_DAY)})
+    assert {t["id"]: t["status"] for t in response.json()} == {1: "blocked", 2: "blocked", 3: "blocked"}
+
+
+def test_single_date_blocked_matches_set_table_status(databases, restaurant, client):
+    add(databases, reservation(1, DAY, "confirmed"), admin_block(1, DAY))
+
+    bulk = set_status(client, "blocked", [DAY], table_ids=[1])
+    single = client.patch("/admin/tables/2/status", headers=admin_headers(1), json={
+        "status": "blocked", "date": str(DAY),
+    }).json()
+
+    assert (bulk["cancelled_reservations"], bulk["removed_blocks"], bulk["created_blocks"]) == (1, 0, 0)
+    assert single["removed_blocks"] == 0
+    after = state(databases)
+    assert after["blocks"] == [(1, DAY, 12, "Window cleaning")]
+    assert after["manual"][1] == after["manual"][2] == ("blocked", str(DAY))
+
+
+def test_empty_cancels_confirmed_and_removes_the_days_blocks(databases, restaurant, client):
+    later = DAY + datetime.timedelta(days=5)
+    add(
+        databases,
+        reservation(1, DAY, "confirmed"), reservation(2, NEXT_DAY, "pending"),
+        reservation(3, NEXT_DAY, "confirmed"), reservation(3, later, "confirmed"),
+        admin_block(1, DAY), admin_block(2, NEXT_DAY), admin_block(3, later),
+    )
+
+    result = set_status(client, "empty", [DAY, NEXT_DAY])
+
+    assert result["cancelled_reservations"] == 2
+    assert result["removed_blocks"] == 2
+    assert result["created_blocks"] == 0
+    after = state(databases)
+    assert after["reservations"] == {
+        (1, DAY, 19): "cancelled", (2, NEXT_DAY, 19): "pending",
+        (3, NEXT_DAY, 19): "cancelled", (3, later, 19): "confirmed",
+    }
+    assert after["blocks"] == [(3, later, 12, "Window cleaning")]
+    assert after["manual"] == {n: ("empty", str(NEXT_DAY)) for n in (1, 2, 3)}
+
+
+def test_blocked_then_empty_only_removes_what_the_day_close_did_not_keep(databases, restaurant, client):
+    add(databases, admin_block(1, NEXT_DAY))
+
+    set_status(client, "blocked", [DAY, NEXT_DAY])
+    assert (1, NEXT_DAY, 12, "Window cleaning") in state(databases)["blocks"]
+
+    # Reopening the first day leaves the admin's block on the second
+    result = set_status(client, "empty", [DAY])
+    assert result["removed_blocks"] == 3
+    assert state(databases)["blocks"] == [(1, NEXT_DAY, 12, "Window cleaning")]
@@ -94,7 +94,21 @@ export default function AdminPage() {
     }
   };
 
-  /* ── Load locations + all reservations on login ─────────── */
+  /* ── Reservations: upcoming ones, plus the selected day when it is past ── */
+  const refreshReservations = useCallback(() => {
+    if (!token) return;
+    const today = new Date().toISOString().split("T")[0];
+    Promise.all([
+      api.adminGetReservations(token, { dateFrom: today }),
+      selectedDate < today
+        ? api.adminGetReservations(token, { dateFrom: selectedDate, dateTo: selectedDate })
+        : Promise.resolve([]),
+    ])
+      .then(([upcoming, pastDay]) => setAllReservations([...upcoming, ...pastDay]))
+      .catch(console.error);
+  }, [token, selectedDate]);
+
+  /* ── Load locations + reservations on login ─────────────── */
   useEffect(() => {
     if (!token) return;
     // Super admins see everything; restaurant admins only need reservations
@@ -102,23 +116,23 @@ export default function AdminPage() {
       api.getLocations().then(setLocations).catch(console.error);
       api.getRestaurants().then(setRestaurants).catch(console.error);
     }
-    api
-      .adminGetReservations(token)
-      .then(setAllReservations)
-      .catch(console.error);
   }, [token, isSuperAdmin, adminRestaurantId]);
 
+  useEffect(() => {
+    refreshReservations();
+  }, [refreshReservations]);
+
   /* ── Auto-poll for new reservations every 15s ───────────── */
   useEffect(() => {
     if (!token) return;
     const interval = setInterval(() => {
-      api.adminGetReservations(token).then(setAllReservations).catch(console.error);
+      refreshReservations();
       if (view.page === "floorplan") {
         api.getAvailability(view.restaurantId, selectedDate).then(setTables).catch(console.error);
       }
     }, 15000);
     return () => clearInterval(interval);
-  }, [token, view, selectedDate]);
+  }, [token, view, selectedDate, refreshReservations]);
 
   /* ── Load tables when viewing a floor plan ──────────────── */
   useEffect(() => {
@@ -144,14 +158,6 @@ export default function AdminPage() {
       .catch(console.error);
   }, [view, selectedDate]);
 
-  const refreshReservations = useCallback(() => {
-    if (!token) return;
-    api
-      .adminGetReservations(token)
-      .then(setAllReservations)
-      .catch(console.error);
-  }, [token]);
-
   /* ── Reservation actions ────────────────────────────────── */
   const handleStatusChange = async (id: number, status: string) => {
     if (!token) return;
@@ -16,10 +16,12 @@ import {
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
-async function request<T>(url: string, options?: RequestInit): Promise<T> {
+async function send(url: string, options?: RequestInit): Promise<Response> {
   const { headers, ...rest } = options || {};
   const res = await fetch(`${API_BASE}${url}`, {
     ...rest,
+    // Sends the API's read-after-write cookie back, so a guest reads their own booking
+    credentials: "include",
     headers: {
       "Content-Type": "application/json",
       ...(headers as Record<string, string>),
@@ -29,10 +31,37 @@ async function request<T>(url: string, options?: RequestInit): Promise<T> {
     const error = await res.json().catch(() => ({ detail: "Request failed" }));
     throw new Error(error.detail || `HTTP ${res.status}`);
   }
+  return res;
+}
+
+async function request<T>(url: string, options?: RequestInit): Promise<T> {
+  const res = await send(url, options);
   if (res.status === 204) return undefined as T;
   return res.json();
 }
 
+// Reads every page of a keyset-paged list, following X-Next-Cursor
+async function requestAllPages<T>(url: string, options?: RequestInit): Promise<T[]> {
+  const rows: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const separator = url.includes("?") ? "&" : "?";
+    const page = cursor ? `${url}${separator}cursor=${encodeURIComponent(cursor)}` : url;
+    const res = await send(page, options);
+    rows.push(...(await res.json()));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return rows;
+}
+
+const RESERVATIONS_PAGE_SIZE = 500;
+
+export interface ReservationFilters {
+  restaurantId?: number;
+  dateFrom?: string;
+  dateTo?: string;
+}
+
 function authHeaders(token: string): Record<string, string> {
   return { Authorization: `Bearer ${token}` };
 }
@@ -69,11 +98,15 @@ export const api = {
       body: JSON.stringify({ email, password }),
     }),
 
-  adminGetReservations: (token: string, restaurantId?: number) =>
-    request<Reservation[]>(
-      `/admin/reservations${restaurantId ? `?restaurant_id=${restaurantId}` : ""}`,
-      { headers: authHeaders(token) }
-    ),
+  adminGetReservations: (token: string, filters: ReservationFilters = {}) => {
+    const params = new URLSearchParams({ limit: String(RESERVATIONS_PAGE_SIZE) });
+    if (filters.restaurantId) params.set("restaurant_id", String(filters.restaurantId));
+    if (filters.dateFrom) params.set("date_from", filters.dateFrom);
+    if (filters.dateTo) params.set("date_to", filters.dateTo);
+    return requestAllPages<Reservation>(`/admin/reservations?${params}`, {
+      headers: authHeaders(token),
+    });
+  },
 
   adminUpdateReservation: (token: string, id: number, status: string) =>
     request<Reservation>(`/admin/reservations/${id}`, {